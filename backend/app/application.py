@@ -1,20 +1,59 @@
+import os
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.configuration.server import Server
+from app.configuration.llm_settings import LLM_WARMUP, LLM_PRECOMPUTE_ENABLED
 from app.containers import create_container
 from app.prisma.prisma import prisma
-from fastapi_pagination import add_pagination
+from app.services.principal_cache import role_directory
+from app.services.auth_service import password_hash_executor
+from app.services.statistics_service import statistics_service
+from app.services.candidate_index import candidate_index
+from app.configuration.statistics_settings import STATISTICS_RECONCILE_ENABLED
 
 """
     The new function which replace @app.on_event("startup") and @app.on_event("shutdown")
 """
 @asynccontextmanager
 async def lifespan(application: FastAPI):
+    # runs in every worker process of app.serve, so each worker has its own Prisma connection
     print("Prisma is connecting")
     await prisma.connect()
+    # static table, authorization resolves role names from memory
+    await role_directory.load()
+    print("LLM worker pool is starting")
+    application.container.init_resources()
+    await application.container.paraphrase_jobs().start()
+    # the model is loaded and warmed up in the background, the server accepts requests meanwhile
+    # and /llm/ready reports when it's done
+    paraphrase_service = application.container.paraphrase_service()
+    await paraphrase_service.load_sentence_tokenizer()
+    warmup = None
+    if LLM_WARMUP:
+        warmup = asyncio.create_task(paraphrase_service.warmup())
+    else:
+        paraphrase_service.skip_warmup()
+    # one pipeline per deployment is enough: with app.serve only the first worker runs it
+    if LLM_PRECOMPUTE_ENABLED and os.getenv("SERVE_WORKER_NUMBER", "0") == "0":
+        application.container.paraphrase_precompute().start()
+    if STATISTICS_RECONCILE_ENABLED and os.getenv("SERVE_WORKER_NUMBER", "0") == "0":
+        statistics_service.start()
+    # the candidate index lives in process memory, every worker loads and refreshes its own
+    candidate_index.start()
     # stop execution of function and send values
     # but retain state to enable, for continue function executing
     yield 
+    print("LLM worker pool is stopping")
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    await application.container.paraphrase_precompute().close()
+    await statistics_service.close()
+    await candidate_index.close()
+    await application.container.paraphrase_jobs().close()
+    await application.container.paraphrase_scheduler().close()
+    application.container.shutdown_resources()
+    password_hash_executor.shutdown(wait=False)
     print("Prisma is disconnecting")
     await prisma.disconnect()
 
@@ -26,8 +65,6 @@ def create_app(_=None) -> FastAPI:
     container = create_container()
     app.container = container
 
-    add_pagination(app)
-
     return app
 
 
@@ -0,0 +1,273 @@
+"""
+    Throughput and latency benchmark of ParaphraseModel. By default it runs against a tiny
+    randomly initialized T5 built on the fly from the resume corpus (offline, CPU only,
+    numbers are only comparable between runs of this benchmark), --model runs it against
+    a real model such as BEAUTIFY_MODEL. For every mode it reports:
+    - sequential latency of get_response (p50/p95/p99) and output tokens per second
+    - throughput and latency versus concurrency through the batch scheduler
+    - peak RSS of the process
+    Results are written as JSON, --compare prints the change against an earlier result.
+
+    python -m app.benchmarks.llm_benchmark --output llm_benchmark.json
+    python -m app.benchmarks.llm_benchmark --model path_to_model --compare llm_benchmark.json
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from functools import partial
+from app.benchmarks.process_memory import peak_rss_mb
+from app.benchmarks.resume_corpus import RESUME_SENTENCES
+from app.models.llm_scheduler import ParaphraseBatchScheduler
+from app.utils.executors import BoundedExecutor
+from app.utils.metrics import percentile
+
+
+def build_tiny_model(path: str, seed: int = 0) -> str:
+    # word-level tokenizer over the corpus and a 2-layer T5 with random weights,
+    # the output is gibberish but it goes through exactly the same generate() paths
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, processors, trainers
+    from transformers import PreTrainedTokenizerFast, T5Config, T5ForConditionalGeneration
+
+    tokenizer = Tokenizer(models.WordLevel(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.train_from_iterator(RESUME_SENTENCES + ["Is it a question?"],
+                                  trainers.WordLevelTrainer(special_tokens=["<pad>", "</s>", "<unk>"]))
+    tokenizer.decoder = decoders.WordPiece(prefix="##")
+    tokenizer.post_processor = processors.TemplateProcessing(single="$A </s>", special_tokens=[("</s>", 1)])
+    fast_tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, pad_token="<pad>", eos_token="</s>",
+                                             unk_token="<unk>", model_input_names=["input_ids", "attention_mask"])
+
+    torch.manual_seed(seed)
+    config = T5Config(vocab_size=len(fast_tokenizer), d_model=64, d_ff=128, num_layers=2, num_decoder_layers=2,
+                      num_heads=2, d_kv=32, pad_token_id=0, eos_token_id=1, decoder_start_token_id=0)
+    model = T5ForConditionalGeneration(config)
+    calibrate_eos(model, fast_tokenizer)
+
+    fast_tokenizer.save_pretrained(path)
+    model.save_pretrained(path)
+    return path
+
+
+def calibrate_eos(model, tokenizer, target_tokens: int = 30):
+    # a random model almost never emits </s>, so every decode would run to max_length=1000;
+    # the </s> embedding is pointed along the mean decoder state and scaled until outputs
+    # of greedy, beam search and sampling end after a few dozen tokens, like real paraphrases
+    import torch
+
+    encoded = tokenizer(RESUME_SENTENCES[:8], return_tensors="pt", padding=True)
+    eos_embedding = model.get_output_embeddings().weight
+    with torch.no_grad():
+        output = model.generate(**encoded, max_new_tokens=60, do_sample=False,
+                                output_hidden_states=True, return_dict_in_generate=True)
+        states = torch.cat([step[-1][:, -1] for step in output.decoder_hidden_states])
+        direction = states.mean(dim=0) / states.mean(dim=0).norm()
+
+        def output_tokens(sequences) -> float:
+            return ((sequences != 0) & (sequences != 1)).sum(dim=1).float().mean().item()
+
+        best_scale, best_error = 0.0, None
+        for step in range(25):
+            scale = step * 0.25
+            eos_embedding[1] = direction * scale
+            torch.manual_seed(0)
+            # roughly the 'fast', 'default' and sampling settings of ParaphraseModel
+            beams = output_tokens(model.generate(**encoded, max_new_tokens=100, num_beams=3, num_return_sequences=3,
+                                                 repetition_penalty=6.0, no_repeat_ngram_size=2))
+            diverse_beams = output_tokens(model.generate(**encoded, max_new_tokens=100, num_beams=3, num_beam_groups=3,
+                                                         num_return_sequences=3, diversity_penalty=4.0,
+                                                         repetition_penalty=6.0, no_repeat_ngram_size=2))
+            sampled = output_tokens(model.generate(**encoded, max_new_tokens=100, do_sample=True, temperature=0.8,
+                                                   no_repeat_ngram_size=2))
+            if min(beams, diverse_beams, sampled) < 5:
+                continue
+            error = sum(abs(tokens - target_tokens) for tokens in (beams, diverse_beams, sampled))
+            if best_error is None or error < best_error:
+                best_scale, best_error = scale, error
+        eos_embedding[1] = direction * best_scale
+
+
+def latency_summary(latencies: list) -> dict:
+    values = sorted(latencies)
+    return {
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
+
+
+def run_sequential(model, tokenizer, sentences: list, mode: str, num_return_sequences: int) -> dict:
+    latencies, output_tokens = [], 0
+    started = time.perf_counter()
+    for sentence in sentences:
+        request_started = time.perf_counter()
+        result = model.get_response(sentence, mode, num_return_sequences=num_return_sequences)
+        latencies.append(time.perf_counter() - request_started)
+        if result.candidates:
+            output_tokens += sum(len(ids) for ids in tokenizer(result.candidates, add_special_tokens=False).input_ids)
+    elapsed = time.perf_counter() - started
+
+    summary = latency_summary(latencies)
+    summary["requests"] = len(sentences)
+    summary["output_tokens"] = output_tokens
+    summary["output_tokens_per_second"] = round(output_tokens / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+async def run_concurrent(scheduler: ParaphraseBatchScheduler, sentences: list, mode: str,
+                         num_return_sequences: int, concurrency: int, requests: int) -> dict:
+    # `concurrency` clients, each sends its next request as soon as the previous one is answered
+    latencies = []
+    next_request = iter(range(requests))
+
+    async def client():
+        for index in next_request:
+            request_started = time.perf_counter()
+            await scheduler.submit(sentences[index % len(sentences)], mode, 0.8, num_return_sequences)
+            latencies.append(time.perf_counter() - request_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    summary = latency_summary(latencies)
+    summary["concurrency"] = concurrency
+    summary["requests"] = requests
+    summary["requests_per_second"] = round(requests / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+async def run_concurrency_sweep(model, sentences: list, modes: list, num_return_sequences: int,
+                                concurrency_levels: list, requests: int, workers: int, torch_threads: int) -> dict:
+    from app.models.llm_models import limit_torch_threads
+
+    executor = BoundedExecutor("llm-benchmark", workers, initializer=partial(limit_torch_threads, torch_threads))
+    scheduler = ParaphraseBatchScheduler(lambda: model, executor)
+    try:
+        sweep = {}
+        for mode in modes:
+            sweep[mode] = []
+            for concurrency in concurrency_levels:
+                sweep[mode].append(await run_concurrent(scheduler, sentences, mode, num_return_sequences,
+                                                        concurrency, requests))
+                print(f"{mode} x{concurrency}: {sweep[mode][-1]}")
+        sweep["scheduler"] = scheduler.stats()
+        return sweep
+    finally:
+        await scheduler.close()
+        executor.shutdown()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(report: dict, baseline: dict):
+    # positive change = slower (latency) or faster (throughput), always printed as current / baseline
+    print(f"Comparison with {baseline.get('commit') or 'baseline'}:")
+    for mode, current in report["sequential"].items():
+        previous = baseline.get("sequential", {}).get(mode)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms", "output_tokens_per_second"):
+            if previous.get(metric):
+                print(f"  {mode:8} {metric:26} {previous[metric]:>10} -> {current[metric]:>10} "
+                      f"({current[metric] / previous[metric]:.2f}x)")
+    for mode, levels in report.get("concurrency", {}).items():
+        previous_levels = {level["concurrency"]: level for level in baseline.get("concurrency", {}).get(mode, [])
+                           if isinstance(level, dict) and "concurrency" in level}
+        for level in levels if isinstance(levels, list) else []:
+            previous = previous_levels.get(level["concurrency"])
+            if previous and previous.get("requests_per_second"):
+                print(f"  {mode:8} x{level['concurrency']:<3} requests_per_second     "
+                      f"{previous['requests_per_second']:>10} -> {level['requests_per_second']:>10} "
+                      f"({level['requests_per_second'] / previous['requests_per_second']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ParaphraseModel throughput and latency benchmark")
+    parser.add_argument("--model", default=None, help="model path or name, a tiny random model by default")
+    parser.add_argument("--modes", nargs="+", default=["fast", "default", "sample"])
+    parser.add_argument("--num-return-sequences", type=int, default=3)
+    parser.add_argument("--sentences", type=int, default=len(RESUME_SENTENCES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrency level")
+    parser.add_argument("--workers", type=int, default=1, help="inference executor workers")
+    parser.add_argument("--torch-threads", type=int, default=0, help="0 = cores / workers")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="earlier JSON result to compare with")
+    args = parser.parse_args()
+
+    torch_threads = args.torch_threads or max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    sentences = RESUME_SENTENCES[:args.sentences]
+
+    with tempfile.TemporaryDirectory() as tiny_model_dir:
+        model_path = args.model or build_tiny_model(tiny_model_dir)
+
+        import torch
+        from transformers import AutoTokenizer
+        from app.models.llm_models import ParaphraseModel, limit_torch_threads
+
+        limit_torch_threads(torch_threads)
+        rss_before_load = peak_rss_mb()
+        load_started = time.perf_counter()
+        model = ParaphraseModel(model_path)
+        load_seconds = time.perf_counter() - load_started
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        rss_after_load = peak_rss_mb()
+
+        # one-time allocations stay out of the measurements
+        for mode in args.modes:
+            model.get_response(sentences[0], mode, num_return_sequences=args.num_return_sequences)
+
+        sequential = {}
+        for mode in args.modes:
+            sequential[mode] = run_sequential(model, tokenizer, sentences, mode, args.num_return_sequences)
+            print(f"{mode} sequential: {sequential[mode]}")
+
+        concurrency = asyncio.run(run_concurrency_sweep(model, sentences, args.modes, args.num_return_sequences,
+                                                        args.concurrency, args.requests, args.workers,
+                                                        torch_threads))
+
+    report = {
+        "commit": git_commit(),
+        "model": args.model or "tiny-random-t5",
+        "num_return_sequences": args.num_return_sequences,
+        "environment": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+            "torch_threads": torch_threads,
+            "executor_workers": args.workers,
+        },
+        "load_seconds": round(load_seconds, 3),
+        "sequential": sequential,
+        "concurrency": concurrency,
+        "memory": {
+            "rss_before_load_mb": round(rss_before_load, 1),
+            "rss_after_load_mb": round(rss_after_load, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results are written to {args.output}")
+    if args.compare:
+        with open(args.compare) as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+    Compares fp32, int8 dynamic quantization and bf16 autocast inference of ParaphraseModel
+    on a fixed corpus of resume sentences: latency, peak RSS and overlap of the outputs with fp32.
+    Every variant runs in its own process, so peak RSS is measured per variant.
+
+    python -m app.benchmarks.quantization_benchmark --model path_to_model --output quantization.json
+"""
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from app.benchmarks.process_memory import peak_rss_mb
+from app.benchmarks.resume_corpus import RESUME_SENTENCES
+from app.utils.metrics import percentile
+
+VARIANTS: dict = {
+    "fp32": {"quantization": "none", "bf16_autocast": False},
+    "int8": {"quantization": "int8", "bf16_autocast": False},
+    "bf16": {"quantization": "none", "bf16_autocast": True},
+}
+
+
+def run_variant(model_path: str, variant: str, sentences: list, mode: str, num_return_sequences: int) -> dict:
+    from app.models.llm_models import ParaphraseModel
+
+    rss_before_load = peak_rss_mb()
+    model = ParaphraseModel(model_path, **VARIANTS[variant])
+    rss_after_load = peak_rss_mb()
+
+    # first call pays one-time allocations, keep it out of the numbers
+    model.get_response(sentences[0], mode, num_return_sequences=num_return_sequences)
+
+    latencies, outputs = [], []
+    for sentence in sentences:
+        started = time.perf_counter()
+        result = model.get_response(sentence, mode, num_return_sequences=num_return_sequences)
+        latencies.append(time.perf_counter() - started)
+        outputs.append(result.candidates)
+
+    return {
+        "latencies": latencies,
+        "outputs": outputs,
+        "rss_before_load_mb": round(rss_before_load, 1),
+        "rss_after_load_mb": round(rss_after_load, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def token_f1(reference: str, candidate: str) -> float:
+    reference_tokens, candidate_tokens = reference.lower().split(), candidate.lower().split()
+    if not reference_tokens or not candidate_tokens:
+        return float(reference_tokens == candidate_tokens)
+    common = sum(min(reference_tokens.count(token), candidate_tokens.count(token)) for token in set(candidate_tokens))
+    if common == 0:
+        return 0.0
+    precision, recall = common / len(candidate_tokens), common / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+def output_overlap(reference_outputs: list, outputs: list) -> dict:
+    # top-1 candidate compared with the fp32 top-1 candidate of the same sentence
+    exact, f1 = [], []
+    for reference, candidates in zip(reference_outputs, outputs):
+        reference_top = reference[0] if reference else ""
+        candidate_top = candidates[0] if candidates else ""
+        exact.append(float(reference_top == candidate_top))
+        f1.append(token_f1(reference_top, candidate_top))
+    return {
+        "top1_exact_match": round(sum(exact) / len(exact), 4) if exact else 0.0,
+        "top1_token_f1": round(sum(f1) / len(f1), 4) if f1 else 0.0,
+    }
+
+
+def summarize(run: dict) -> dict:
+    latencies = sorted(run["latencies"])
+    return {
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "rss_before_load_mb": run["rss_before_load_mb"],
+        "model_rss_mb": round(run["rss_after_load_mb"] - run["rss_before_load_mb"], 1),
+        "peak_rss_mb": run["peak_rss_mb"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ParaphraseModel precision benchmark")
+    parser.add_argument("--model", default=os.getenv("BEAUTIFY_MODEL"))
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--mode", default="default")
+    parser.add_argument("--num-return-sequences", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=len(RESUME_SENTENCES))
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    sentences = RESUME_SENTENCES[:args.limit]
+    variants = ["fp32"] + [variant for variant in args.variants if variant != "fp32"]
+    context = multiprocessing.get_context("spawn")
+
+    runs = {}
+    for variant in variants:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs[variant] = pool.submit(run_variant, args.model, variant, sentences,
+                                        args.mode, args.num_return_sequences).result()
+
+    baseline = summarize(runs["fp32"])
+    report = {"model": args.model, "mode": args.mode, "sentences": len(sentences),
+              "num_return_sequences": args.num_return_sequences, "variants": {}}
+    for variant, run in runs.items():
+        summary = summarize(run)
+        summary["speedup"] = round(baseline["mean_ms"] / summary["mean_ms"], 2) if summary["mean_ms"] else 0.0
+        summary["model_memory_ratio"] = round(summary["model_rss_mb"] / baseline["model_rss_mb"], 2) \
+            if baseline["model_rss_mb"] else 0.0
+        summary["overlap_with_fp32"] = output_overlap(runs["fp32"]["outputs"], run["outputs"])
+        report["variants"][variant] = summary
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
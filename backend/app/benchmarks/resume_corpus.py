@@ -0,0 +1,23 @@
+# Fixed set of resume-style sentences, so benchmark results stay comparable between runs
+RESUME_SENTENCES: list = [
+    "I have five years of experience developing web applications with Python and Django.",
+    "Designed and implemented REST APIs that serve more than a million requests per day.",
+    "Led a team of four developers and mentored two junior engineers.",
+    "Migrated a monolithic application to microservices running in Docker containers.",
+    "Improved the performance of SQL queries by adding indexes and rewriting joins.",
+    "Worked closely with designers to build responsive user interfaces in React.",
+    "Set up continuous integration pipelines with automated tests and code review.",
+    "Responsible for the deployment and monitoring of services in the cloud.",
+    "I am a motivated software engineer who enjoys solving complex problems.",
+    "Developed a mobile application for ordering food using Kotlin.",
+    "Wrote unit and integration tests that increased code coverage to ninety percent.",
+    "Participated in the full software development life cycle from requirements to release.",
+    "Built data pipelines that process customer events in near real time.",
+    "Created internal tools that reduced the time spent on manual reporting.",
+    "I am looking for a position where I can grow as a backend developer.",
+    "Maintained legacy code written in Java and gradually refactored it.",
+    "Implemented authentication and authorization with JSON Web Tokens.",
+    "Optimized the memory usage of a machine learning service written in C++.",
+    "Collaborated with product managers to prioritize features for each sprint.",
+    "Good knowledge of algorithms, data structures and object oriented design.",
+]
@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+
+dotenv_path = 'app/.env'
+
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+# Authenticated users kept in memory between requests, keyed by the token subject;
+# approval and deletion invalidate the entry in the worker that handled them,
+# the other app.serve workers see the change when the entry expires
+PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+
+# bcrypt cost factor: stored hashes with another cost are rehashed on the next login
+BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Threads hashing and verifying passwords, a login burst waits for them instead of blocking the event loop
+PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(2, os.cpu_count() or 1)))
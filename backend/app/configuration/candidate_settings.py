@@ -0,0 +1,15 @@
+import os
+from dotenv import load_dotenv
+
+dotenv_path = 'app/.env'
+
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+# Every app.serve worker keeps its own candidate index: resume writes update the index of the
+# worker that handled them, the full rebuild brings the other workers up to date
+CANDIDATE_INDEX_REFRESH_SECONDS: float = float(os.getenv("CANDIDATE_INDEX_REFRESH_SECONDS", 300))
+# Years of experience in a language above which candidates score the same
+CANDIDATE_EXPERIENCE_CAP_YEARS: float = float(os.getenv("CANDIDATE_EXPERIENCE_CAP_YEARS", 10))
+CANDIDATES_DEFAULT: int = int(os.getenv("CANDIDATES_DEFAULT", 20))
+CANDIDATES_MAX: int = int(os.getenv("CANDIDATES_MAX", 100))
@@ -0,0 +1,61 @@
+import os
+from dotenv import load_dotenv
+
+dotenv_path = 'app/.env'
+
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+# Micro-batching of /llm/paraphrase requests
+LLM_BATCH_MAX_SIZE: int = int(os.getenv("LLM_BATCH_MAX_SIZE", 8))
+LLM_BATCH_WINDOW_MS: float = float(os.getenv("LLM_BATCH_WINDOW_MS", 20))
+
+# Inference worker pool, 0 torch threads = split the CPU cores evenly between workers
+LLM_WORKERS: int = int(os.getenv("LLM_WORKERS", 1))
+LLM_TORCH_THREADS: int = int(os.getenv("LLM_TORCH_THREADS", 0))
+
+# Paraphrase result cache, an empty LLM_CACHE_PATH keeps it in memory only
+LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", 1024))
+LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", 86400))
+LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "")
+
+# Texts at least this long (and with more than one sentence) are paraphrased sentence by sentence
+LLM_LONG_TEXT_MIN_CHARS: int = int(os.getenv("LLM_LONG_TEXT_MIN_CHARS", 200))
+
+# Upper bounds for one paraphrase request: sequences generated over all retries and wall-clock time
+LLM_MAX_GENERATED_SEQUENCES: int = int(os.getenv("LLM_MAX_GENERATED_SEQUENCES", 48))
+LLM_GENERATION_BUDGET_SECONDS: float = float(os.getenv("LLM_GENERATION_BUDGET_SECONDS", 30))
+
+# CPU inference precision: LLM_QUANTIZATION=none|int8 (dynamic int8 Linear layers), optional bf16 autocast
+LLM_QUANTIZATION: str = os.getenv("LLM_QUANTIZATION", "none").lower()
+LLM_BF16_AUTOCAST: bool = os.getenv("LLM_BF16_AUTOCAST", "false").lower() in ("1", "true", "yes")
+
+# Model weights are read from the local path / HF cache only (set in the Docker image, which has them baked in,
+# elsewhere a hub model is downloaded on first load); warmup loads the model in the background at startup
+LLM_LOCAL_FILES_ONLY: bool = os.getenv("LLM_LOCAL_FILES_ONLY", "false").lower() in ("1", "true", "yes")
+LLM_WARMUP: bool = os.getenv("LLM_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# Admission control of /llm/paraphrase: requests admitted at once (more get 503) and the deadline of each (504)
+LLM_MAX_IN_FLIGHT: int = int(os.getenv("LLM_MAX_IN_FLIGHT", 32))
+LLM_REQUEST_DEADLINE_SECONDS: float = float(os.getenv("LLM_REQUEST_DEADLINE_SECONDS", 60))
+
+# Background paraphrase jobs (/llm/jobs): finished jobs are kept for the retention time; jobs are stored
+# in the paraphrase_jobs table, a worker checks it every poll interval for the cancellations of its jobs
+# and for the jobs streamed by /llm/jobs/{id}/events that another worker runs
+LLM_JOB_RETENTION_SECONDS: float = float(os.getenv("LLM_JOB_RETENTION_SECONDS", 3600))
+LLM_JOBS_MAX_PENDING: int = int(os.getenv("LLM_JOBS_MAX_PENDING", 1000))
+LLM_JOB_POLL_SECONDS: float = float(os.getenv("LLM_JOB_POLL_SECONDS", 1))
+# The process running a job refreshes its heartbeat every poll interval; a pending job without a heartbeat
+# for this long belongs to a process that is gone and is marked as failed
+LLM_JOB_HEARTBEAT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_JOB_HEARTBEAT_TIMEOUT_SECONDS", 30))
+
+# Precomputed suggestions for visible resumes, refreshed every interval while the model is idle;
+# off by default, a pass runs the full beam search over every resume text
+LLM_PRECOMPUTE_ENABLED: bool = os.getenv("LLM_PRECOMPUTE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_PRECOMPUTE_INTERVAL_SECONDS: float = float(os.getenv("LLM_PRECOMPUTE_INTERVAL_SECONDS", 3600))
+LLM_PRECOMPUTE_PAGE_SIZE: int = int(os.getenv("LLM_PRECOMPUTE_PAGE_SIZE", 32))
+LLM_PRECOMPUTE_NUM_RETURN_SEQUENCES: int = int(os.getenv("LLM_PRECOMPUTE_NUM_RETURN_SEQUENCES", 3))
+
+# 'fast' preview tier: output budget = input tokens * ratio + min new tokens
+LLM_FAST_NEW_TOKENS_RATIO: float = float(os.getenv("LLM_FAST_NEW_TOKENS_RATIO", 1.5))
+LLM_FAST_MIN_NEW_TOKENS: int = int(os.getenv("LLM_FAST_MIN_NEW_TOKENS", 8))
@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+
+dotenv_path = 'app/.env'
+
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+# Pre-fork serving mode (python -m app.serve), SERVE_WORKERS=0 = one per CPU core;
+# every worker has its own caches and candidate index, so more workers is an explicit choice
+SERVE_HOST: str = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT: int = int(os.getenv("SERVE_PORT", 7676))
+SERVE_WORKERS: int = int(os.getenv("SERVE_WORKERS", 1))
+# A crashed worker is restarted after 1s, 2s, 4s... up to the max backoff; a worker that
+# crashes more than SERVE_MAX_RESTARTS times in a row (each within a minute of its start)
+# shuts the server down instead of being respawned forever
+SERVE_RESTART_MAX_BACKOFF_SECONDS: float = float(os.getenv("SERVE_RESTART_MAX_BACKOFF_SECONDS", 60))
+SERVE_MAX_RESTARTS: int = int(os.getenv("SERVE_MAX_RESTARTS", 5))
@@ -0,0 +1,12 @@
+import os
+from dotenv import load_dotenv
+
+dotenv_path = 'app/.env'
+
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+# The statistics_counters table is maintained by triggers, the reconciliation job
+# (first app.serve worker only) repairs drift: once at startup, then every interval
+STATISTICS_RECONCILE_ENABLED: bool = os.getenv("STATISTICS_RECONCILE_ENABLED", "true").lower() in ("1", "true", "yes")
+STATISTICS_RECONCILE_INTERVAL_SECONDS: float = float(os.getenv("STATISTICS_RECONCILE_INTERVAL_SECONDS", 3600))
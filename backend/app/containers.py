@@ -1,13 +1,120 @@
+import os
+from functools import partial
 from dependency_injector import containers, providers
-from app.models.llm_models import (
-    ParaphraseModel
+from app.configuration.llm_settings import (
+    LLM_WORKERS,
+    LLM_TORCH_THREADS,
+    LLM_CACHE_SIZE,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_PATH,
+    LLM_MAX_IN_FLIGHT,
+    LLM_REQUEST_DEADLINE_SECONDS,
+    LLM_PRECOMPUTE_ENABLED
 )
+from app.models.llm_cache import ParaphraseResultCache
+from app.models.llm_scheduler import ParaphraseBatchScheduler
 from app.routers import llm_router
-from app.models import llm_models
+from app.services.llm_service import ParaphraseService
+from app.services.llm_job_service import ParaphraseJobService
+from app.services.llm_precompute_service import ParaphrasePrecomputeService
+from app.services.llm_suggestion_store import ParaphraseSuggestionStore
+from app.services.llm_job_store import ParaphraseJobStore
+from app.utils.admission import AdmissionController
+from app.utils.executors import BoundedExecutor
+
+
+# torch and transformers take seconds to import, app.models.llm_models is imported
+# only when the model is created or an inference worker starts, not at application startup
+def create_paraphrase_model():
+    from app.models.llm_models import ParaphraseModel
+    return ParaphraseModel()
+
+
+def init_torch_threads(num_threads: int):
+    from app.models.llm_models import limit_torch_threads
+    limit_torch_threads(num_threads)
+
+
+def init_inference_executor(max_workers: int, torch_threads: int):
+    if torch_threads <= 0:
+        # split the cores between workers so parallel batches don't oversubscribe the CPU
+        torch_threads = (os.cpu_count() or 1) // max(1, max_workers)
+
+    executor = BoundedExecutor("llm-inference", max_workers,
+                               initializer=partial(init_torch_threads, torch_threads))
+    yield executor
+    executor.shutdown()
+
+
+def init_paraphrase_cache(maxsize: int, ttl_seconds: float, disk_path: str):
+    cache = ParaphraseResultCache(maxsize, ttl_seconds, disk_path or None)
+    yield cache
+    cache.close()
+
 
 class ModelsContainer(containers.DeclarativeContainer):
     beautify_model = providers.DelegatedThreadSafeSingleton(
-        ParaphraseModel
+        create_paraphrase_model
+    )
+
+    inference_executor = providers.Resource(
+        init_inference_executor,
+        max_workers=LLM_WORKERS,
+        torch_threads=LLM_TORCH_THREADS
+    )
+
+    # beautify_model is a delegated provider, so the scheduler receives the provider itself
+    # and the weights are loaded only when the first batch runs
+    paraphrase_scheduler = providers.Singleton(
+        ParaphraseBatchScheduler,
+        model_provider=beautify_model,
+        executor=inference_executor
+    )
+
+    paraphrase_cache = providers.Resource(
+        init_paraphrase_cache,
+        maxsize=LLM_CACHE_SIZE,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        disk_path=LLM_CACHE_PATH
+    )
+
+    paraphrase_suggestions = providers.Singleton(
+        ParaphraseSuggestionStore
+    )
+
+    paraphrase_service = providers.Singleton(
+        ParaphraseService,
+        scheduler=paraphrase_scheduler,
+        cache=paraphrase_cache,
+        model_provider=beautify_model,
+        executor=inference_executor,
+        # without the pipeline the table stays empty, a lookup on every cache miss would be wasted
+        suggestions=paraphrase_suggestions if LLM_PRECOMPUTE_ENABLED else None
+    )
+
+    paraphrase_precompute = providers.Singleton(
+        ParaphrasePrecomputeService,
+        paraphrase_service=paraphrase_service,
+        store=paraphrase_suggestions,
+        scheduler=paraphrase_scheduler,
+        executor=inference_executor
+    )
+
+    paraphrase_job_store = providers.Singleton(
+        ParaphraseJobStore
+    )
+
+    paraphrase_jobs = providers.Singleton(
+        ParaphraseJobService,
+        paraphrase_service=paraphrase_service,
+        store=paraphrase_job_store
+    )
+
+    paraphrase_admission = providers.Singleton(
+        AdmissionController,
+        name="paraphrase",
+        max_in_flight=LLM_MAX_IN_FLIGHT,
+        deadline_seconds=LLM_REQUEST_DEADLINE_SECONDS
     )
 
 def create_container() -> ModelsContainer:
@@ -16,8 +123,7 @@ def create_container() -> ModelsContainer:
     models_container.wire(
         modules=[
             __name__,
-            llm_router,
-            llm_models
+            llm_router
         ]
     )
 
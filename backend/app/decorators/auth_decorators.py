@@ -1,25 +1,63 @@
-from fastapi import HTTPException, Depends
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, Depends, Request
 from functools import wraps
 from app.prisma.prisma import prisma
+from app.routers.auth_router import oauth2_scheme
 from app.services.auth_service import AuthService
+from app.services.principal_cache import principal_cache, role_directory
+
+
+@dataclass(frozen=True)
+class Principal:
+    # the authenticated user of the current request
+    user_id: str
+    email: str
+    role_id: Optional[int]
+    role: Optional[str]
+    is_approved: Optional[bool]
+
+
+async def get_principal(request: Request, token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+        Verifies the token and resolves the user once per request: the result is kept in
+        request.state for check_roles and the handler, and in the principal cache for the
+        next requests, so only a cache miss costs a query (the role name comes from the preloaded roles).
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    payload = AuthService().decode_token(token)
+    subject = payload["sub"]
+    principal = principal_cache.get(subject)
+    if principal is None:
+        user = await prisma.users.find_unique(where={"email": subject})
+        if user is None:
+            raise HTTPException(status_code=401, detail="Unauthorized: User not found")
+
+        principal = Principal(user_id=user.user_id,
+                              email=user.email,
+                              role_id=user.role_id_fk,
+                              role=await role_directory.get_role(user.role_id_fk),
+                              is_approved=user.is_approved)
+        principal_cache.set(subject, principal)
+    request.state.principal = principal
+    return principal
+
 
 def check_roles(expected_roles: list):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            token = kwargs.get('token')
-            if token is None:
+            principal = kwargs.get('principal')
+            if principal is None:
                 raise HTTPException(status_code=401, detail="Unauthorized: Token missing")
 
-            user_role = await AuthService().get_role_from_token(token)
-            print(user_role)
-            print(expected_roles)
-            if user_role not in expected_roles:
+            if principal.role not in expected_roles:
                 raise HTTPException(status_code=403, detail="Forbidden: Insufficient role")
-            
-            email = AuthService().get_email_from_token(token)
-            user = await prisma.users.find_unique(where={"email": email})
-            if (not user.is_approved):
+
+            if (not principal.is_approved):
                 raise HTTPException(status_code=403, detail="Forbidden: Your account has not yet been approved by the administrator")
 
             return await func(*args, **kwargs)
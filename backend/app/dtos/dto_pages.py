@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class DtoKeysetPage(BaseModel, Generic[T]):
+    items: List[T]
+    size: int
+    # the page is ordered by these fields, next_cursor points after the last item
+    sort_by: List[str]
+    next_cursor: Optional[str] = None
+    # only filled with include_total=true
+    total: Optional[int] = None
+    pages: Optional[int] = None
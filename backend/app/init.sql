@@ -7,9 +7,9 @@ create table if not exists "roles" (
     role varchar(100) unique not null
 );
 
-insert into roles (role) values ('Administrator');
-insert into roles (role) values ('Employer');
-insert into roles (role) values ('Applicant');
+insert into roles (role) values ('Administrator') on conflict (role) do nothing;
+insert into roles (role) values ('Employer') on conflict (role) do nothing;
+insert into roles (role) values ('Applicant') on conflict (role) do nothing;
 
 create table if not exists "users" (
     user_id uuid not null default uuid_generate_v4() primary key,
@@ -83,6 +83,14 @@ create table if not exists companies (
     experience_id_fk uuid references experiences (experience_id) on delete cascade
 );
 
+-- resume search (ResumeService.get_resumes) walks resumes -> skills -> programming_languages -> experiences
+create index if not exists resumes_visibility_resume_id_idx on resumes (visibility, resume_id);
+create index if not exists skills_resume_id_fk_idx on skills (resume_id_fk);
+create index if not exists programming_languages_language_skill_idx on programming_languages (programming_language, skill_id_fk);
+create index if not exists programming_languages_skill_id_fk_idx on programming_languages (skill_id_fk);
+create index if not exists experiences_language_experience_level_idx on experiences (programming_language_id_fk, experience, level);
+create index if not exists companies_experience_id_fk_idx on companies (experience_id_fk);
+
 create table if not exists teams (
     team_id uuid not null default uuid_generate_v4() primary key,
     name varchar(250) not null,
@@ -117,4 +125,449 @@ create table if not exists chat_users (
     chat_id uuid references chats(chat_id) on delete cascade,
     user_id uuid references users(user_id) on delete cascade,
     primary key (chat_id, user_id)
-);
\ No newline at end of file
+);
+
+create table if not exists paraphrase_suggestions (
+    source_hash char(64) not null,
+    mode varchar(50) not null,
+    num_return_sequences smallint not null,
+    response text[] not null,
+    created_at timestamp not null default timezone('utc', current_timestamp(0)),
+    last_seen_at timestamp not null default timezone('utc', current_timestamp(0)),
+    primary key (source_hash, mode, num_return_sequences)
+);
+
+create index if not exists paraphrase_suggestions_last_seen_at_idx on paraphrase_suggestions (last_seen_at);
+
+-- Background paraphrase jobs (/llm/jobs), shared by all app.serve workers: the worker that
+-- accepted a job runs it, any worker answers polls, cancellations and event streams
+create table if not exists paraphrase_jobs (
+    job_id char(32) not null primary key,
+    owner varchar(255) not null,
+    params jsonb not null,
+    -- pending -> done | failed | cancelled
+    status varchar(20) not null default 'pending',
+    result jsonb,
+    error text,
+    cancel_requested boolean not null default false,
+    -- the process running the job: hostname-pid-boot id
+    worker varchar(255) not null,
+    created_at double precision not null,
+    heartbeat_at double precision not null default 0,
+    finished_at double precision
+);
+
+-- databases created before the heartbeat, their pending jobs expire right away
+alter table paraphrase_jobs alter column worker type varchar(255);
+alter table paraphrase_jobs add column if not exists heartbeat_at double precision not null default 0;
+drop index if exists paraphrase_jobs_status_worker_idx;
+
+create index if not exists paraphrase_jobs_status_heartbeat_idx on paraphrase_jobs (status, heartbeat_at);
+create index if not exists paraphrase_jobs_finished_at_idx on paraphrase_jobs (finished_at);
+
+-- Dashboard statistics (/resume/statistics), kept up to date by the triggers below:
+-- kind is 'resume_language', 'experience_bucket', 'experience_level' or 'hired_language'.
+-- Only visible resumes are counted, a null experience level is stored as ''.
+create table if not exists statistics_counters (
+    kind varchar(50) not null,
+    key varchar(250) not null,
+    count integer not null default 0,
+    primary key (kind, key)
+);
+
+create or replace function statistics_experience_bucket(p_experience real)
+returns text as $$
+    select case
+        when p_experience >= 10 then '10+'
+        when p_experience >= 5 then '5+'
+        when p_experience >= 2 then '2+'
+        else '<2'
+    end;
+$$ language sql immutable;
+
+-- the counters as computed from the data, used to repair drift
+create or replace view statistics_from_data as
+    select 'resume_language'::varchar(50) as kind, pl.programming_language::varchar(250) as key, count(*)::int as count
+    from resumes r
+    join skills s on s.resume_id_fk = r.resume_id
+    join programming_languages pl on pl.skill_id_fk = s.skill_id
+    where r.visibility = 'visible'
+    group by pl.programming_language
+    union all
+    select 'experience_bucket', statistics_experience_bucket(e.experience), count(*)::int
+    from resumes r
+    join skills s on s.resume_id_fk = r.resume_id
+    join programming_languages pl on pl.skill_id_fk = s.skill_id
+    join experiences e on e.programming_language_id_fk = pl.programming_language_id
+    where r.visibility = 'visible'
+    group by statistics_experience_bucket(e.experience)
+    union all
+    select 'experience_level', coalesce(e.level, ''), count(*)::int
+    from resumes r
+    join skills s on s.resume_id_fk = r.resume_id
+    join programming_languages pl on pl.skill_id_fk = s.skill_id
+    join experiences e on e.programming_language_id_fk = pl.programming_language_id
+    where r.visibility = 'visible'
+    group by coalesce(e.level, '')
+    union all
+    select 'hired_language', btrim(l.language), count(*)::int
+    from team_members tm
+    join teams t on t.team_id = tm.team_id_fk
+    cross join lateral unnest(string_to_array(t.important_languages, ',')) as l(language)
+    where tm.status = 'hired' and btrim(l.language) <> ''
+    group by btrim(l.language);
+
+-- adds p_sign * (experience buckets and levels) of the experiences of the given programming_languages rows
+create or replace function statistics_apply_experiences(p_languages uuid[], p_sign integer)
+returns void as $$
+begin
+    insert into statistics_counters (kind, key, count)
+    select 'experience_bucket', statistics_experience_bucket(e.experience), p_sign * count(*)
+    from experiences e
+    where e.programming_language_id_fk = any(p_languages)
+    group by statistics_experience_bucket(e.experience)
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+
+    insert into statistics_counters (kind, key, count)
+    select 'experience_level', coalesce(e.level, ''), p_sign * count(*)
+    from experiences e
+    where e.programming_language_id_fk = any(p_languages)
+    group by coalesce(e.level, '')
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+end;
+$$ language plpgsql;
+
+-- adds p_sign * (languages, experience buckets and levels) of the given programming_languages rows
+create or replace function statistics_apply_languages(p_languages uuid[], p_sign integer)
+returns void as $$
+begin
+    insert into statistics_counters (kind, key, count)
+    select 'resume_language', pl.programming_language, p_sign * count(*)
+    from programming_languages pl
+    where pl.programming_language_id = any(p_languages)
+    group by pl.programming_language
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+
+    perform statistics_apply_experiences(p_languages, p_sign);
+end;
+$$ language plpgsql;
+
+create or replace function statistics_add(p_kind text, p_key text, p_delta integer)
+returns void as $$
+begin
+    insert into statistics_counters (kind, key, count)
+    values (p_kind, p_key, p_delta)
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+end;
+$$ language plpgsql;
+
+-- a row counts only while its whole chain up to a visible resume exists: a parent subtracts
+-- its subtree before it's deleted, the cascaded child deletes find no parent and change nothing
+-- plpgsql and not sql functions: the plan of the lookup is cached for the session
+create or replace function statistics_skill_visible(p_skill_id uuid)
+returns boolean as $$
+begin
+    return exists (
+        select 1 from skills s join resumes r on r.resume_id = s.resume_id_fk
+        where s.skill_id = p_skill_id and r.visibility = 'visible'
+    );
+end;
+$$ language plpgsql stable;
+
+create or replace function statistics_language_visible(p_language_id uuid)
+returns boolean as $$
+begin
+    return exists (
+        select 1 from programming_languages pl
+        join skills s on s.skill_id = pl.skill_id_fk
+        join resumes r on r.resume_id = s.resume_id_fk
+        where pl.programming_language_id = p_language_id and r.visibility = 'visible'
+    );
+end;
+$$ language plpgsql stable;
+
+create or replace function statistics_resumes_trigger()
+returns trigger as $$
+begin
+    if tg_op = 'DELETE' then
+        if old.visibility = 'visible' then
+            perform statistics_apply_languages(array(
+                select pl.programming_language_id from skills s
+                join programming_languages pl on pl.skill_id_fk = s.skill_id
+                where s.resume_id_fk = old.resume_id), -1);
+        end if;
+        return old;
+    end if;
+
+    if (old.visibility = 'visible') <> (new.visibility = 'visible') then
+        perform statistics_apply_languages(array(
+            select pl.programming_language_id from skills s
+            join programming_languages pl on pl.skill_id_fk = s.skill_id
+            where s.resume_id_fk = new.resume_id), case when new.visibility = 'visible' then 1 else -1 end);
+    end if;
+    return new;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_resumes_delete_trigger
+before delete on resumes
+for each row
+execute function statistics_resumes_trigger();
+
+create or replace trigger statistics_resumes_update_trigger
+after update of visibility on resumes
+for each row
+execute function statistics_resumes_trigger();
+
+create or replace function statistics_skills_trigger()
+returns trigger as $$
+declare
+    old_visible boolean;
+    new_visible boolean;
+begin
+    if tg_op = 'DELETE' then
+        if statistics_skill_visible(old.skill_id) then
+            perform statistics_apply_languages(array(
+                select pl.programming_language_id from programming_languages pl
+                where pl.skill_id_fk = old.skill_id), -1);
+        end if;
+        return old;
+    end if;
+
+    -- the skill moved to another resume, its languages count only if that one is visible
+    old_visible := exists (select 1 from resumes r where r.resume_id = old.resume_id_fk and r.visibility = 'visible');
+    new_visible := exists (select 1 from resumes r where r.resume_id = new.resume_id_fk and r.visibility = 'visible');
+    if old_visible <> new_visible then
+        perform statistics_apply_languages(array(
+            select pl.programming_language_id from programming_languages pl
+            where pl.skill_id_fk = new.skill_id), case when new_visible then 1 else -1 end);
+    end if;
+    return new;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_skills_delete_trigger
+before delete on skills
+for each row
+execute function statistics_skills_trigger();
+
+create or replace trigger statistics_skills_update_trigger
+after update of resume_id_fk on skills
+for each row
+execute function statistics_skills_trigger();
+
+create or replace function statistics_programming_languages_trigger()
+returns trigger as $$
+declare
+    old_visible boolean;
+    new_visible boolean;
+begin
+    if tg_op = 'DELETE' then
+        if statistics_language_visible(old.programming_language_id) then
+            perform statistics_apply_languages(array[old.programming_language_id], -1);
+        end if;
+        return old;
+    end if;
+
+    old_visible := statistics_skill_visible(old.skill_id_fk);
+    new_visible := statistics_skill_visible(new.skill_id_fk);
+    if old_visible then
+        perform statistics_add('resume_language', old.programming_language, -1);
+    end if;
+    if new_visible then
+        perform statistics_add('resume_language', new.programming_language, 1);
+    end if;
+    -- moved to another skill: the experiences go with the language
+    if old_visible <> new_visible then
+        perform statistics_apply_experiences(array[new.programming_language_id], case when new_visible then 1 else -1 end);
+    end if;
+    return new;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_programming_languages_delete_trigger
+before delete on programming_languages
+for each row
+execute function statistics_programming_languages_trigger();
+
+create or replace trigger statistics_programming_languages_update_trigger
+after update of programming_language, skill_id_fk on programming_languages
+for each row
+execute function statistics_programming_languages_trigger();
+
+-- inserts are counted once per statement, a bulk insert adds one delta per language
+-- instead of updating the same counter row for every inserted row;
+-- experiences are inserted after their language and count themselves
+create or replace function statistics_programming_languages_insert_trigger()
+returns trigger as $$
+begin
+    insert into statistics_counters (kind, key, count)
+    select 'resume_language', i.programming_language, count(*)
+    from inserted i
+    join skills s on s.skill_id = i.skill_id_fk
+    join resumes r on r.resume_id = s.resume_id_fk
+    where r.visibility = 'visible'
+    group by i.programming_language
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_programming_languages_insert_trigger
+after insert on programming_languages
+referencing new table as inserted
+for each statement
+execute function statistics_programming_languages_insert_trigger();
+
+create or replace function statistics_experiences_trigger()
+returns trigger as $$
+begin
+    if statistics_language_visible(old.programming_language_id_fk) then
+        perform statistics_add('experience_bucket', statistics_experience_bucket(old.experience), -1);
+        perform statistics_add('experience_level', coalesce(old.level, ''), -1);
+    end if;
+    if tg_op = 'DELETE' then
+        return old;
+    end if;
+
+    if statistics_language_visible(new.programming_language_id_fk) then
+        perform statistics_add('experience_bucket', statistics_experience_bucket(new.experience), 1);
+        perform statistics_add('experience_level', coalesce(new.level, ''), 1);
+    end if;
+    return new;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_experiences_delete_trigger
+before delete on experiences
+for each row
+execute function statistics_experiences_trigger();
+
+create or replace trigger statistics_experiences_update_trigger
+after update of experience, level, programming_language_id_fk on experiences
+for each row
+execute function statistics_experiences_trigger();
+
+create or replace function statistics_experiences_insert_trigger()
+returns trigger as $$
+begin
+    with visible as (
+        select i.experience, i.level
+        from inserted i
+        join programming_languages p on p.programming_language_id = i.programming_language_id_fk
+        join skills s on s.skill_id = p.skill_id_fk
+        join resumes r on r.resume_id = s.resume_id_fk
+        where r.visibility = 'visible'
+    )
+    insert into statistics_counters (kind, key, count)
+    select 'experience_bucket', statistics_experience_bucket(v.experience), count(*)
+    from visible v
+    group by 2
+    union all
+    select 'experience_level', coalesce(v.level, ''), count(*)
+    from visible v
+    group by 2
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_experiences_insert_trigger
+after insert on experiences
+referencing new table as inserted
+for each statement
+execute function statistics_experiences_insert_trigger();
+
+-- adds p_count to every language of a team's important_languages
+create or replace function statistics_apply_team_languages(p_languages text, p_count integer)
+returns void as $$
+begin
+    if p_count = 0 or p_languages is null then
+        return;
+    end if;
+    insert into statistics_counters (kind, key, count)
+    select 'hired_language', btrim(l.language), p_count * count(*)
+    from unnest(string_to_array(p_languages, ',')) as l(language)
+    where btrim(l.language) <> ''
+    group by btrim(l.language)
+    on conflict (kind, key) do update set count = statistics_counters.count + excluded.count;
+end;
+$$ language plpgsql;
+
+create or replace function statistics_team_members_trigger()
+returns trigger as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.status = 'hired' then
+        perform statistics_apply_team_languages(
+            (select t.important_languages from teams t where t.team_id = old.team_id_fk), -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.status = 'hired' then
+        perform statistics_apply_team_languages(
+            (select t.important_languages from teams t where t.team_id = new.team_id_fk), 1);
+    end if;
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_team_members_trigger
+after insert or delete or update of status, team_id_fk on team_members
+for each row
+execute function statistics_team_members_trigger();
+
+create or replace function statistics_teams_trigger()
+returns trigger as $$
+declare
+    hired integer;
+begin
+    select count(*) into hired from team_members
+    where team_id_fk = old.team_id and status = 'hired';
+    perform statistics_apply_team_languages(old.important_languages, -hired);
+    if tg_op = 'DELETE' then
+        return old;
+    end if;
+    perform statistics_apply_team_languages(new.important_languages, hired);
+    return new;
+end;
+$$ language plpgsql;
+
+create or replace trigger statistics_teams_delete_trigger
+before delete on teams
+for each row
+execute function statistics_teams_trigger();
+
+create or replace trigger statistics_teams_update_trigger
+after update of important_languages on teams
+for each row
+execute function statistics_teams_trigger();
+
+-- repairs the counters that differ from the data, returns how many were wrong.
+-- The drift (data - counters) is read in one statement, so both sides come from the same snapshot,
+-- and it is added to the counter rows as they are when written: trigger deltas committed in between
+-- change the data and the counters alike and don't change the drift, so nothing is locked.
+create or replace function statistics_reconcile()
+returns integer as $$
+declare
+    repaired integer;
+begin
+    with drift as (
+        select coalesce(d.kind, c.kind) as kind, coalesce(d.key, c.key) as key,
+               coalesce(d.count, 0) - coalesce(c.count, 0) as delta
+        from statistics_from_data d
+        full join statistics_counters c on c.kind = d.kind and c.key = d.key
+        where coalesce(c.count, 0) <> coalesce(d.count, 0)
+    ), fixed as (
+        insert into statistics_counters (kind, key, count)
+        select drift.kind, drift.key, drift.delta from drift
+        on conflict (kind, key) do update set count = statistics_counters.count + excluded.count
+        returning 1
+    )
+    select count(*) into repaired from fixed;
+
+    delete from statistics_counters where count = 0;
+
+    return repaired;
+end;
+$$ language plpgsql;
+
+-- counters of a database that existed before the statistics triggers (see app/migrate.py)
+select statistics_reconcile();
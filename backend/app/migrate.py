@@ -0,0 +1,25 @@
+"""
+    Applies init.sql to an existing database. The postgres container runs init.sql only when
+    its data directory is created, so tables, indexes, functions and triggers added later
+    (e.g. the dashboard statistics counters) are missing from older databases. Every statement
+    in init.sql is idempotent, applying it again only adds what is missing; the statistics
+    counters are filled by the statistics_reconcile() call at its end.
+
+    python -m app.migrate
+"""
+import os
+import sys
+from prisma.cli import prisma as prisma_cli
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main() -> int:
+    # DATABASE_URL (as set in compose.yaml) or the datasource url of schema.prisma
+    database_url = os.getenv("DATABASE_URL")
+    target = ["--url", database_url] if database_url else ["--schema", os.path.join(APP_DIR, "schema.prisma")]
+    return prisma_cli.run(["db", "execute", "--file", os.path.join(APP_DIR, "init.sql"), *target])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
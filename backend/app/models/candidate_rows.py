@@ -0,0 +1,142 @@
+from typing import Optional
+import numpy as np
+
+# number of set bits of every byte value
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def canonical_language(name: str) -> str:
+    # " python" and "Python" are the same language
+    return " ".join(name.split()).casefold()
+
+
+class CandidateRows:
+    """
+        One row per resume: `bits` has a bit per language id, `experience` the years per language id.
+        Both arrays are stored language-major (a byte of bits or a language of experience is one
+        contiguous array over all rows), so a match only reads the team languages.
+        Freed rows are zeroed and reused, so they never match.
+    """
+    def __init__(self, capacity: int = 1024, languages_capacity: int = 64):
+        self.language_ids: dict = {}
+        self.language_names: list = []
+        self.bits = np.zeros((languages_capacity // 8, capacity), dtype=np.uint8)
+        self.experience = np.zeros((languages_capacity, capacity), dtype=np.float32)
+        self.resume_ids: list = [None] * capacity
+        self.user_ids: list = [None] * capacity
+        self.titles: list = [None] * capacity
+        self.rows: dict = {}
+        self.user_rows: dict = {}
+        self.free: list = []
+        # rows [0, used) have been handed out
+        self.used = 0
+
+    def language_id(self, name: str) -> int:
+        key = canonical_language(name)
+        if key not in self.language_ids:
+            if len(self.language_names) == self.experience.shape[0]:
+                self.__grow(languages=True)
+            self.language_ids[key] = len(self.language_names)
+            self.language_names.append(" ".join(name.split()))
+        return self.language_ids[key]
+
+    def upsert(self, resume_id: str, user_id: Optional[str], title: str, languages: dict):
+        row = self.rows.get(resume_id)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+            else:
+                if self.used == len(self.resume_ids):
+                    self.__grow(languages=False)
+                row = self.used
+                self.used += 1
+            self.rows[resume_id] = row
+        self.bits[:, row] = 0
+        self.experience[:, row] = 0
+        for name, years in languages.items():
+            column = self.language_id(name)
+            self.bits[column >> 3, row] |= np.uint8(1 << (column & 7))
+            # a language written twice keeps its longest experience
+            self.experience[column, row] = max(self.experience[column, row], years or 0.0)
+        self.resume_ids[row] = resume_id
+        self.user_ids[row] = user_id
+        self.titles[row] = title
+        if user_id is not None:
+            self.user_rows[user_id] = row
+
+    def remove(self, resume_id: str):
+        row = self.rows.pop(resume_id, None)
+        if row is None:
+            return
+        self.bits[:, row] = 0
+        self.experience[:, row] = 0
+        if self.user_rows.get(self.user_ids[row]) == row:
+            del self.user_rows[self.user_ids[row]]
+        self.resume_ids[row] = self.user_ids[row] = self.titles[row] = None
+        self.free.append(row)
+
+    def remove_user(self, user_id: str):
+        row = self.user_rows.get(user_id)
+        if row is not None:
+            self.remove(self.resume_ids[row])
+
+    def match(self, languages: list, limit: int, experience_cap: float, exclude_users=()) -> list:
+        """
+            Top `limit` resumes by the number of team languages they have, then by their capped
+            experience in them. The experience part stays below 1 unless every language matches,
+            so a resume with more team languages always ranks higher.
+        """
+        required = len(languages)
+        columns = [self.language_ids[canonical_language(language)] for language in languages
+                   if canonical_language(language) in self.language_ids]
+        if not columns or self.used == 0:
+            return []
+
+        masks = {}
+        for column in columns:
+            masks[column >> 3] = masks.get(column >> 3, 0) | (1 << (column & 7))
+        used = self.used
+        matched = np.zeros(used, dtype=np.int16)
+        for byte, mask in masks.items():
+            matched += POPCOUNT[self.bits[byte, :used] & np.uint8(mask)]
+        experience = np.zeros(used, dtype=np.float32)
+        for column in columns:
+            experience += np.minimum(self.experience[column, :used], experience_cap)
+        score = matched + experience / np.float32(experience_cap * required)
+
+        eligible = matched > 0
+        for user_id in exclude_users:
+            row = self.user_rows.get(user_id)
+            if row is not None:
+                eligible[row] = False
+        candidates = np.flatnonzero(eligible)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-score[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.lexsort((candidates, -score[candidates]))]
+
+        result = []
+        for row in candidates.tolist():
+            matched_columns = [column for column in columns if self.bits[column >> 3, row] & (1 << (column & 7))]
+            result.append({
+                "resume_id": self.resume_ids[row],
+                "user_id_fk": self.user_ids[row],
+                "title": self.titles[row],
+                "score": round(float(score[row]), 4),
+                "coverage": round(int(matched[row]) / required, 4),
+                "matched_languages": [self.language_names[column] for column in matched_columns],
+                "experience": {self.language_names[column]: round(float(self.experience[column, row]), 1)
+                               for column in matched_columns},
+            })
+        return result
+
+    def __grow(self, languages: bool):
+        if languages:
+            extra = self.experience.shape[0]
+            self.bits = np.pad(self.bits, ((0, extra // 8), (0, 0)))
+            self.experience = np.pad(self.experience, ((0, extra), (0, 0)))
+        else:
+            extra = len(self.resume_ids)
+            self.bits = np.pad(self.bits, ((0, 0), (0, extra)))
+            self.experience = np.pad(self.experience, ((0, 0), (0, extra)))
+            for values in (self.resume_ids, self.user_ids, self.titles):
+                values.extend([None] * extra)
@@ -0,0 +1,43 @@
+"""
+    Downloads the NLTK punkt model and the paraphrase model into the local caches,
+    so the application can run with LLM_LOCAL_FILES_ONLY and without network access.
+    Runs at image build time (the build fails without a model), or before an offline local run:
+
+    python -m app.models.llm_assets --model name_or_path_of_model
+"""
+import os
+import argparse
+from dotenv import load_dotenv
+
+dotenv_path = 'app/.env'
+
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+
+def download_assets(model_path: str):
+    # an image without the model could never answer a paraphrase request, so the build fails instead
+    if not model_path:
+        raise SystemExit("BEAUTIFY_MODEL is not set, pass it as a build argument "
+                         "(it is read from app/.env by docker compose) or with --model")
+
+    import nltk
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    if not nltk.download('punkt', quiet=True):
+        raise RuntimeError("Failed to download the NLTK punkt model")
+
+    AutoTokenizer.from_pretrained(model_path)
+    AutoModelForSeq2SeqLM.from_pretrained(model_path)
+    print(f"Model {model_path} is in the local cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download LLM assets for offline startup")
+    parser.add_argument("--model", default=os.getenv("BEAUTIFY_MODEL"))
+    args = parser.parse_args()
+    download_assets(args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+from app.models.llm_models_schemas import DETERMINISTIC_MODES
+from app.utils.lru_ttl_cache import LRUTTLCache
+
+
+def normalize_text(text: str) -> str:
+    # runs of spaces inside a line don't change what the model generates, line breaks do:
+    # long texts are split and stitched back line by line, in their original layout
+    return "\n".join(" ".join(line.split()) for line in text.split("\n"))
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class ParaphraseResultCache:
+    """
+        Cache of paraphrase responses keyed by a fingerprint of the normalized request.
+        Beam search ('default' and 'fast' modes) is deterministic, so its results are always cached;
+        sampling results are cached only when the caller explicitly allows it.
+        With disk_path set, entries are also written to a SQLite file and survive restarts.
+    """
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 86400, disk_path: Optional[str] = None):
+        self.__memory = LRUTTLCache(maxsize, ttl_seconds)
+        self.__ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.__disk: Optional[sqlite3.Connection] = None
+        self.__disk_lock = threading.Lock()
+        self.disk_hits = 0
+
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self.__disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self.__disk.execute("""create table if not exists paraphrase_cache (
+                                       fingerprint text primary key,
+                                       response text not null,
+                                       created_at real not null)""")
+            self.__prune_disk()
+
+    @staticmethod
+    def fingerprint(text: str, mode: str, temperature: float, num_return_sequences: int,
+                    by_sentences: bool = False) -> str:
+        if mode in DETERMINISTIC_MODES:
+            temperature = None
+        key = [normalize_text(text), mode, temperature, num_return_sequences]
+        if by_sentences:
+            key.append("sentences")
+        payload = json.dumps(key)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_cacheable(mode: str, allow_sampling: bool = False) -> bool:
+        return mode in DETERMINISTIC_MODES or allow_sampling
+
+    def get(self, fingerprint: str) -> Optional[list]:
+        response = self.__memory.get(fingerprint)
+        if response is not None or self.__disk is None:
+            return response
+
+        with self.__disk_lock:
+            row = self.__disk.execute("select response, created_at from paraphrase_cache where fingerprint = ?",
+                                      (fingerprint,)).fetchone()
+        if row is None or self.__is_expired(row[1]):
+            return None
+
+        self.disk_hits += 1
+        response = json.loads(row[0])
+        self.__memory.set(fingerprint, response)
+        return response
+
+    def set(self, fingerprint: str, response: list):
+        self.__memory.set(fingerprint, response)
+        if self.__disk is None:
+            return
+
+        with self.__disk_lock:
+            self.__disk.execute("insert or replace into paraphrase_cache (fingerprint, response, created_at) values (?, ?, ?)",
+                                (fingerprint, json.dumps(response), time.time()))
+            self.__disk.commit()
+
+    def stats(self) -> dict:
+        stats = self.__memory.stats()
+        stats["disk_enabled"] = self.__disk is not None
+        stats["disk_hits"] = self.disk_hits
+        return stats
+
+    def close(self):
+        if self.__disk is not None:
+            with self.__disk_lock:
+                self.__disk.close()
+            self.__disk = None
+
+    def __is_expired(self, created_at: float) -> bool:
+        return self.__ttl_seconds is not None and created_at + self.__ttl_seconds <= time.time()
+
+    def __prune_disk(self):
+        if self.__ttl_seconds is None:
+            return
+        with self.__disk_lock:
+            self.__disk.execute("delete from paraphrase_cache where created_at <= ?", (time.time() - self.__ttl_seconds,))
+            self.__disk.commit()
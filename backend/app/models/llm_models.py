@@ -1,22 +1,39 @@
 import os
 import sys
-import nltk
 import torch
+import time
 import logging
+import threading
+from contextlib import nullcontext
 from transformers import (
     AutoTokenizer,
     AutoModelForSeq2SeqLM,
     T5TokenizerFast,
     T5ForConditionalGeneration,
     PreTrainedTokenizer,
-    PreTrainedTokenizerFast
+    PreTrainedTokenizerFast,
+    StoppingCriteria,
+    StoppingCriteriaList
 )
+from transformers.generation.streamers import BaseStreamer
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Callable, Optional, Union
+from dataclasses import dataclass
 from dotenv import load_dotenv
 from transformers.utils import ModelOutput
+from transformers.modeling_outputs import BaseModelOutput
+from app.configuration.llm_settings import (
+    LLM_MAX_GENERATED_SEQUENCES,
+    LLM_GENERATION_BUDGET_SECONDS,
+    LLM_QUANTIZATION,
+    LLM_BF16_AUTOCAST,
+    LLM_LOCAL_FILES_ONLY,
+    LLM_FAST_NEW_TOKENS_RATIO,
+    LLM_FAST_MIN_NEW_TOKENS
+)
+from app.models.llm_models_schemas import ParaphraseResult
+from app.models.llm_text import split_into_sentences
 
-nltk.download('punkt')
 dotenv_path = 'app/.env'
 
 if os.path.exists(dotenv_path):
@@ -25,6 +42,70 @@ if os.path.exists(dotenv_path):
 BEAUTIFY_MODEL: str = os.getenv("BEAUTIFY_MODEL")
 
 
+def limit_torch_threads(num_threads: int):
+    # executor initializer, caps intra-op threads of the calling worker thread
+    torch.set_num_threads(max(1, num_threads))
+
+
+class CandidateStreamer(BaseStreamer):
+    # generate() pushes one token per candidate on every decoding step,
+    # on_text(index, text) is called with the decoded text of each candidate that grew
+    def __init__(self, tokenizer: Union[PreTrainedTokenizer, PreTrainedTokenizerFast],
+                 on_text: Callable[[int, str], None]):
+        self.__tokenizer = tokenizer
+        self.__on_text = on_text
+        self.__tokens: list = []
+        self.__texts: list = []
+        self.__prompt_skipped = False
+
+    def put(self, value: torch.Tensor):
+        # the first call carries the decoder start tokens, not generated text
+        if not self.__prompt_skipped:
+            self.__prompt_skipped = True
+            return
+
+        step_tokens = value.view(-1).tolist()
+        if not self.__tokens:
+            self.__tokens = [[] for _ in step_tokens]
+            self.__texts = ["" for _ in step_tokens]
+
+        for index, token in enumerate(step_tokens):
+            self.__tokens[index].append(token)
+            text = self.__tokenizer.decode(self.__tokens[index], skip_special_tokens=True)
+            # finished candidates only receive padding, which decodes to the same text
+            if text != self.__texts[index]:
+                self.__texts[index] = text
+                self.__on_text(index, text)
+
+    def end(self):
+        pass
+
+
+class CancellationCriteria(StoppingCriteria):
+    # stops generation as soon as the client that asked for it is gone
+    def __init__(self, cancelled: threading.Event):
+        self.__cancelled = cancelled
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        return self.__cancelled.is_set()
+
+
+@dataclass
+class EncodedInput:
+    # tokenized texts together with the encoder output, computed once and decoded many times
+    input_ids: torch.Tensor
+    attention_mask: torch.Tensor
+    encoder_hidden_states: torch.Tensor
+
+    def select(self, indices: list) -> "EncodedInput":
+        if indices == list(range(self.input_ids.shape[0])):
+            return self
+        rows = torch.tensor(indices, device=self.input_ids.device)
+        return EncodedInput(self.input_ids.index_select(0, rows),
+                            self.attention_mask.index_select(0, rows),
+                            self.encoder_hidden_states.index_select(0, rows))
+
+
 class AbstractModel(ABC):
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -50,8 +131,25 @@ class AbstractModel(ABC):
         decoded = self.__decode(tokenizer, generated)
         return decoded
 
+    def encode_input(self, tokenizer: Union[PreTrainedTokenizer, PreTrainedTokenizerFast],
+                     model, text: Union[str, list], encode_params: dict) -> EncodedInput:
+        tokens = tokenizer(text, **encode_params).to(self.device)
+        with torch.no_grad():
+            encoder_output = model.get_encoder()(input_ids=tokens.input_ids, attention_mask=tokens.attention_mask)
+        return EncodedInput(tokens.input_ids, tokens.attention_mask, encoder_output.last_hidden_state)
+
+    def processing_encoded(self, tokenizer: Union[PreTrainedTokenizer, PreTrainedTokenizerFast],
+                           model, encoded: EncodedInput, generate_params: dict) -> list:
+        # only the decoder runs here; generate() expands encoder_outputs in place
+        # for beams and return sequences, so every call gets its own wrapper
+        encoder_outputs = BaseModelOutput(last_hidden_state=encoded.encoder_hidden_states)
+        generated = self.__generate(model, encoded.input_ids, attention_mask=encoded.attention_mask,
+                                    encoder_outputs=encoder_outputs, **generate_params)
+        decoded = self.__decode(tokenizer, generated)
+        return decoded
+
     def split_text_into_sentences(self, text: str) -> list:
-        sentences: list = nltk.sent_tokenize(text)
+        sentences, _ = split_into_sentences(text)
         return sentences
 
     @abstractmethod
@@ -59,12 +157,30 @@ class AbstractModel(ABC):
         pass
 
 class ParaphraseModel(AbstractModel):
-    def __init__(self, model_path: str = BEAUTIFY_MODEL):
-        self.__tokenizer = AutoTokenizer.from_pretrained(model_path)
-        self.__model = AutoModelForSeq2SeqLM.from_pretrained(model_path).to(self.device)
+    def __init__(self, model_path: str = BEAUTIFY_MODEL, quantization: str = LLM_QUANTIZATION,
+                 bf16_autocast: bool = LLM_BF16_AUTOCAST, local_files_only: bool = LLM_LOCAL_FILES_ONLY):
+        # with local_files_only the weights come from model_path or the local HF cache only,
+        # a missing model fails fast instead of hanging on the network
+        self.__tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=local_files_only)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path, local_files_only=local_files_only)
 
-    def split_text_into_sentences(self, text: str) -> list:
-        pass
+        self.quantization = quantization if self.device.type == "cpu" else "none"
+        if self.quantization == "int8":
+            # int8 weights for every Linear layer, activations are quantized on the fly
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif self.quantization != "none":
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+
+        self.bf16_autocast = bf16_autocast
+        if self.bf16_autocast and self.quantization == "int8":
+            # dynamically quantized Linear layers only accept fp32 activations
+            print("bf16 autocast is not supported together with int8 quantization, it is disabled")
+            self.bf16_autocast = False
+
+        self.__model = model.to(self.device)
+        # every vocabulary token that would put a '?' into the output
+        self.__question_token_ids = [[token_id] for token, token_id in self.__tokenizer.get_vocab().items()
+                                     if '?' in token]
 
     def _output_validation(self, original_text: str, output_lines: list) -> list:
         original_has_question = '?' in original_text
@@ -79,31 +195,175 @@ class ParaphraseModel(AbstractModel):
 
         return validated_output_lines
 
-    def get_response(self, text: str, mode: str, temperature: float = 0.8, num_return_sequences: int = 3) -> list:
-        output = self.generate(text, mode, temperature, num_return_sequences * 2)
-        validated_output = self._output_validation(text, output)
+    def get_response(self, text: str, mode: str, temperature: float = 0.8, num_return_sequences: int = 3) -> ParaphraseResult:
+        return self.get_batch_response([text], mode, temperature, num_return_sequences)[0]
+
+    def get_batch_response(self, texts: list, mode: str, temperature: float = 0.8, num_return_sequences: int = 3) -> list:
+        deadline = time.monotonic() + LLM_GENERATION_BUDGET_SECONDS
+        # texts are tokenized and run through the encoder once, every decode below
+        # (first pass, retries, both modes for mode='both') reuses the encoder output
+        encoded = self.encode(texts)
+
+        modes = ('default', 'sample') if mode == 'both' else (mode,)
+        results = [self._decode_with_retries(texts, encoded, current_mode, temperature, num_return_sequences, deadline)
+                   for current_mode in modes]
+        if len(results) == 1:
+            return results[0]
 
+        responses = []
+        for mode_results in zip(*results):
+            candidates = []
+            for result in mode_results:
+                candidates.extend(item for item in result.candidates if item not in candidates)
+            responses.append(ParaphraseResult(candidates=candidates,
+                                              partial=any(result.partial for result in mode_results),
+                                              generated_sequences=sum(result.generated_sequences for result in mode_results)))
+        return responses
+
+    def _decode_with_retries(self, texts: list, encoded: EncodedInput, mode: str, temperature: float,
+                             num_return_sequences: int, deadline: float) -> list:
+        validated_outputs = [[] for _ in texts]
+        generated_sequences = [0 for _ in texts]
+
+        # the fast tier makes a single short pass, whatever it gives is the preview
+        num_gen_sequences = num_return_sequences if mode == 'fast' else num_return_sequences * 2
+        num_gen_sequences = min(num_gen_sequences, LLM_MAX_GENERATED_SEQUENCES)
+        self._decode_round(texts, list(range(len(texts))), encoded, mode, temperature, num_gen_sequences,
+                           deadline, validated_outputs, generated_sequences)
+        if mode == 'fast':
+            return self.__results(validated_outputs, generated_sequences, num_return_sequences)
+
+        # texts still short of valid candidates are retried together, with a growing number of
+        # sequences, bounded by LLM_MAX_GENERATED_SEQUENCES in total and by the time budget;
+        # whatever is found by then is returned as a partial result
+        num_gen_sequences = 12
         try:
-            if len(validated_output) >= num_return_sequences:
-                return validated_output[:num_return_sequences]
-            else:
-                num_gen_sequences = 12
-                while len(validated_output) < num_return_sequences:
-                    output = self.generate(text, mode, temperature, num_gen_sequences)
-                    for item in self._output_validation(text, output):
-                        if item not in validated_output:
-                            validated_output.append(item)
-                    num_gen_sequences = num_gen_sequences * 2
-                return validated_output[:num_return_sequences]
+            while True:
+                indices = [index for index, validated_output in enumerate(validated_outputs)
+                           if len(validated_output) < num_return_sequences]
+                if not indices:
+                    break
+                num_gen_sequences = min(num_gen_sequences,
+                                        LLM_MAX_GENERATED_SEQUENCES - max(generated_sequences[index] for index in indices))
+                if num_gen_sequences <= 0 or self.__remaining(deadline) <= 0:
+                    break
+
+                self._decode_round(texts, indices, encoded, mode, temperature, num_gen_sequences,
+                                   deadline, validated_outputs, generated_sequences)
+                num_gen_sequences = num_gen_sequences * 2
         except Exception as ex:
             print(ex)
 
-    def generate(self, text: str, mode: str = 'default', temperature: float = 0.8, num_return_sequences: int = 3) -> list:
+        return self.__results(validated_outputs, generated_sequences, num_return_sequences)
+
+    @staticmethod
+    def __results(validated_outputs: list, generated_sequences: list, num_return_sequences: int) -> list:
+        return [ParaphraseResult(candidates=validated_output[:num_return_sequences],
+                                 partial=len(validated_output) < num_return_sequences,
+                                 generated_sequences=generated)
+                for validated_output, generated in zip(validated_outputs, generated_sequences)]
+
+    def _decode_round(self, texts: list, indices: list, encoded: EncodedInput, mode: str, temperature: float,
+                      num_gen_sequences: int, deadline: float, validated_outputs: list, generated_sequences: list):
+        # texts without '?' must not get one in the paraphrase, so they are decoded with
+        # the question tokens banned; one padded decode per group, outputs come back
+        # grouped per input: num_gen_sequences candidates for the first text, then the second...
+        for ban_questions in (True, False):
+            group = [index for index in indices if ('?' not in texts[index]) == ban_questions]
+            if not group:
+                continue
+
+            max_time = self.__remaining(deadline)
+            if max_time <= 0:
+                return
+            started = time.monotonic()
+            output = self.generate([texts[index] for index in group], mode, temperature, num_gen_sequences,
+                                   ban_questions=ban_questions, max_time=max_time,
+                                   encoded=encoded.select(group))
+            for index in group:
+                generated_sequences[index] += num_gen_sequences
+            # MaxTimeCriteria stops the decode mid-sequence when the budget runs out, those
+            # sequences are cut off and are dropped, the texts stay short of candidates (partial)
+            if time.monotonic() - started >= max_time:
+                return
+            for position, index in enumerate(group):
+                candidates = output[position * num_gen_sequences:(position + 1) * num_gen_sequences]
+                for item in self._output_validation(texts[index], candidates):
+                    if item not in validated_outputs[index]:
+                        validated_outputs[index].append(item)
+
+    @staticmethod
+    def __remaining(deadline: float) -> float:
+        return max(0.0, deadline - time.monotonic())
+
+    def stream_generate(self, text: str, temperature: float, num_return_sequences: int,
+                        on_text: Callable[[int, str], None], cancelled: threading.Event,
+                        max_time: Optional[float] = None) -> ParaphraseResult:
+        # beam search can't be streamed (transformers only streams with num_beams=1),
+        # so streamed candidates are always sampled; the same caps as get_batch_response apply
+        num_return_sequences = min(num_return_sequences, LLM_MAX_GENERATED_SEQUENCES)
+        max_time = min(max_time, LLM_GENERATION_BUDGET_SECONDS) if max_time else LLM_GENERATION_BUDGET_SECONDS
         encode_params: dict = {
             "padding": "longest",
             "return_tensors": "pt"
         }
-        if mode == 'default':
+        generate_params: dict = self._generation_params('sample', temperature, num_return_sequences,
+                                                        ban_questions='?' not in text)
+        generate_params["streamer"] = CandidateStreamer(self.__tokenizer, on_text)
+        generate_params["stopping_criteria"] = StoppingCriteriaList([CancellationCriteria(cancelled)])
+        generate_params["max_time"] = max_time
+        started = time.monotonic()
+        with self.__precision():
+            output = self.processing(self.__tokenizer, self.__model, text, encode_params, generate_params)
+        # cut off by the time budget: the streamed text stays a preview, nothing is final
+        if time.monotonic() - started >= max_time:
+            return ParaphraseResult(candidates=[], partial=True, generated_sequences=num_return_sequences)
+        return ParaphraseResult(candidates=self._output_validation(text, output),
+                                generated_sequences=num_return_sequences)
+
+    def encode(self, text: Union[str, list]) -> EncodedInput:
+        encode_params: dict = {
+            "padding": "longest",
+            "return_tensors": "pt"
+        }
+        with self.__precision():
+            return self.encode_input(self.__tokenizer, self.__model, text, encode_params)
+
+    def generate(self, text: Union[str, list], mode: str = 'default', temperature: float = 0.8, num_return_sequences: int = 3,
+                 ban_questions: bool = False, max_time: Optional[float] = None,
+                 encoded: Optional[EncodedInput] = None) -> list:
+        if encoded is None:
+            encoded = self.encode(text)
+        input_tokens = int(encoded.attention_mask.sum(dim=1).max())
+        generate_params: dict = self._generation_params(mode, temperature, num_return_sequences, ban_questions,
+                                                        input_tokens)
+        if max_time is not None:
+            generate_params["max_time"] = max_time
+        with self.__precision():
+            output = self.processing_encoded(self.__tokenizer, self.__model, encoded, generate_params)
+        return output
+
+    def __precision(self):
+        if self.bf16_autocast:
+            return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16)
+        return nullcontext()
+
+    def _generation_params(self, mode: str, temperature: float, num_return_sequences: int,
+                           ban_questions: bool = False, input_tokens: Optional[int] = None) -> dict:
+        if mode == 'fast':
+            # interactive preview: greedy (one candidate) or plain beam search with as many beams
+            # as candidates, a paraphrase is about as long as its source, so the output budget
+            # follows the input length instead of max_length=1000
+            max_new_tokens = int((input_tokens or 0) * LLM_FAST_NEW_TOKENS_RATIO) + LLM_FAST_MIN_NEW_TOKENS
+            generate_params: dict = {
+                "num_beams": num_return_sequences,
+                "num_return_sequences": num_return_sequences,
+                "repetition_penalty": 6.0,
+                "no_repeat_ngram_size": 2,
+                "early_stopping": num_return_sequences > 1,
+                "max_new_tokens": max_new_tokens
+            }
+        elif mode == 'default':
             generate_params: dict = {
                 "num_beams": num_return_sequences,
                 "num_beam_groups": num_return_sequences,
@@ -126,5 +386,6 @@ class ParaphraseModel(AbstractModel):
                 "temperature": temperature,
                 "max_length": 1000
             }
-        output = self.processing(self.__tokenizer, self.__model, text, encode_params, generate_params)
-        return output
\ No newline at end of file
+        if ban_questions and self.__question_token_ids:
+            generate_params["bad_words_ids"] = self.__question_token_ids
+        return generate_params
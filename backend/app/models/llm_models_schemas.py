@@ -1,9 +1,31 @@
 from typing import Optional
+from dataclasses import dataclass
 from pydantic import BaseModel
 
+# beam search / greedy decoding: the same input always gives the same output
+DETERMINISTIC_MODES = ('default', 'fast')
+
 
 class RequestModel(BaseModel):
     query: str = ''
+    # 'default' - diverse beam search, 'fast' - short small-beam preview, 'both' - beam search
+    # and sampling candidates, anything else - sampling
     mode: str = 'default'
     temp: float = 0.8
-    num_return_sequences: int = 3
\ No newline at end of file
+    num_return_sequences: int = 3
+    # sampling output is random, it is served from cache only on request
+    allow_cached_sampling: bool = False
+    # None = decide by text length, long texts are paraphrased sentence by sentence
+    long_text: Optional[bool] = None
+    # the client gives up after this many seconds, capped by LLM_REQUEST_DEADLINE_SECONDS
+    deadline_seconds: Optional[float] = None
+    # with mode='fast': also queue a background job for the 'default' tier, its id comes back as upgrade_job_id
+    prefetch_upgrade: bool = False
+
+
+@dataclass
+class ParaphraseResult:
+    candidates: list
+    # the sequence cap or the time budget ran out before enough valid candidates were found
+    partial: bool = False
+    generated_sequences: int = 0
@@ -0,0 +1,207 @@
+import time
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from app.configuration.llm_settings import LLM_BATCH_MAX_SIZE, LLM_BATCH_WINDOW_MS
+from app.models.llm_models_schemas import DETERMINISTIC_MODES
+from app.utils.executors import BoundedExecutor
+from app.utils.metrics import LatencyWindow
+
+# lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+@dataclass
+class _PendingRequest:
+    text: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class ParaphraseBatchScheduler:
+    """
+        Collects concurrent paraphrase requests for a short window (or until max_batch_size
+        is reached), groups them by generation settings and runs every group as one padded
+        batch through the model. Each caller gets back only its own slice of the output.
+        Batches run on the inference executor, at most one per executor worker at a time.
+        Interactive requests go before background ones; background requests with the same
+        settings fill up the free rows of interactive batches.
+    """
+    def __init__(self, model_provider: Callable, executor: BoundedExecutor,
+                 max_batch_size: int = LLM_BATCH_MAX_SIZE, batch_window_ms: float = LLM_BATCH_WINDOW_MS):
+        # model_provider is the delegated singleton, the model is resolved on the first batch
+        self.__model_provider = model_provider
+        self.__executor = executor
+        self.__max_batch_size = max(1, max_batch_size)
+        self.__batch_window = max(0.0, batch_window_ms) / 1000
+        self.__pending: dict[tuple, deque] = {}
+        self.__wakeup = asyncio.Event()
+        self.__dispatcher: Optional[asyncio.Task] = None
+        self.__free_slots = asyncio.Semaphore(executor.max_workers)
+        self.__running: set[asyncio.Task] = set()
+        self.__closed = False
+        self.__requests_total = 0
+        self.__requests_by_priority = Counter()
+        self.__batch_sizes = Counter()
+        self.__queue_waits = LatencyWindow()
+
+    @staticmethod
+    def group_key(mode: str, temperature: float, num_return_sequences: int) -> tuple:
+        # beam search ignores temperature, so every default/fast request can share a batch
+        if mode in DETERMINISTIC_MODES:
+            temperature = None
+        return mode, temperature, num_return_sequences
+
+    async def submit(self, text: str, mode: str = 'default', temperature: float = 0.8,
+                     num_return_sequences: int = 3, priority: int = PRIORITY_INTERACTIVE) -> list:
+        return (await self.submit_many([text], mode, temperature, num_return_sequences, priority))[0]
+
+    async def submit_many(self, texts: list, mode: str = 'default', temperature: float = 0.8,
+                          num_return_sequences: int = 3, priority: int = PRIORITY_INTERACTIVE) -> list:
+        # all texts are queued at once, so they end up in the same padded batch
+        # (as long as they fit into max_batch_size)
+        if self.__closed:
+            raise RuntimeError("Paraphrase scheduler is shut down")
+
+        key = self.group_key(mode, temperature, num_return_sequences)
+        loop = asyncio.get_running_loop()
+        queue = self.__pending.setdefault((priority, key), deque())
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            queue.append(_PendingRequest(text, future))
+            futures.append(future)
+        self.__requests_total += len(texts)
+        self.__requests_by_priority[priority] += len(texts)
+
+        self.__ensure_dispatcher()
+        self.__wakeup.set()
+        return list(await asyncio.gather(*futures))
+
+    async def close(self):
+        self.__closed = True
+        if self.__dispatcher is not None:
+            self.__dispatcher.cancel()
+            await asyncio.gather(self.__dispatcher, return_exceptions=True)
+
+        for queue in self.__pending.values():
+            for request in queue:
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError("Paraphrase scheduler is shut down"))
+        self.__pending.clear()
+
+        # let batches that are already on the executor deliver their results
+        await asyncio.gather(*self.__running, return_exceptions=True)
+
+    def is_idle(self) -> bool:
+        return not self.__running and not any(self.__pending.values())
+
+    def stats(self) -> dict:
+        batches = sum(self.__batch_sizes.values())
+        batched_requests = sum(size * count for size, count in self.__batch_sizes.items())
+        return {
+            "requests": self.__requests_total,
+            "requests_by_priority": {str(priority): count for priority, count in sorted(self.__requests_by_priority.items())},
+            "pending": sum(len(queue) for queue in self.__pending.values()),
+            "running_batches": len(self.__running),
+            "batches": batches,
+            "max_batch_size": self.__max_batch_size,
+            "batch_window_ms": self.__batch_window * 1000,
+            "mean_batch_size": round(batched_requests / batches, 2) if batches else 0.0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.__batch_sizes.items())},
+            "queue_wait_ms": self.__queue_waits.summary(),
+        }
+
+    def __ensure_dispatcher(self):
+        if self.__dispatcher is None or self.__dispatcher.done():
+            self.__dispatcher = asyncio.get_running_loop().create_task(self.__dispatch_loop())
+
+    async def __dispatch_loop(self):
+        while True:
+            # wait for an idle executor worker first, so requests keep gathering meanwhile
+            await self.__free_slots.acquire()
+            queue_key = await self.__next_ready_group()
+            batch = self.__take_batch(queue_key)
+            if not batch:
+                self.__free_slots.release()
+                continue
+
+            _, key = queue_key
+            task = asyncio.get_running_loop().create_task(self.__run_batch(key, batch))
+            self.__running.add(task)
+            task.add_done_callback(self.__batch_done)
+
+    def __batch_done(self, task: asyncio.Task):
+        self.__running.discard(task)
+        self.__free_slots.release()
+
+    async def __next_ready_group(self) -> tuple:
+        while True:
+            self.__wakeup.clear()
+            now = time.perf_counter()
+            ready_key, ready_order, timeout = None, None, None
+
+            for queue_key, queue in self.__pending.items():
+                if not queue:
+                    continue
+                waited = now - queue[0].enqueued_at
+                if len(queue) >= self.__max_batch_size or waited >= self.__batch_window:
+                    # the most urgent group goes first, within one priority the group
+                    # whose oldest request waits the longest
+                    order = (queue_key[0], queue[0].enqueued_at)
+                    if ready_order is None or order < ready_order:
+                        ready_key, ready_order = queue_key, order
+                else:
+                    remaining = self.__batch_window - waited
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+
+            if ready_key is not None:
+                return ready_key
+
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def __take_batch(self, queue_key: tuple) -> list:
+        priority, key = queue_key
+        # free rows of the batch are filled with less urgent requests that share the settings
+        queue_keys = [queue_key] + sorted(other for other in self.__pending if other[1] == key and other[0] > priority)
+
+        batch = []
+        for current_key in queue_keys:
+            queue = self.__pending[current_key]
+            while queue and len(batch) < self.__max_batch_size:
+                request = queue.popleft()
+                # caller is already gone (cancelled), nothing to compute for it
+                if not request.future.done():
+                    batch.append(request)
+            if not queue:
+                del self.__pending[current_key]
+        return batch
+
+    def __generate(self, key: tuple, texts: list) -> list:
+        # runs on an executor worker, including the first (lazy) model load
+        mode, temperature, num_return_sequences = key
+        model = self.__model_provider()
+        return model.get_batch_response(texts, mode, temperature, num_return_sequences)
+
+    async def __run_batch(self, key: tuple, batch: list):
+        started = time.perf_counter()
+        for request in batch:
+            self.__queue_waits.add(started - request.enqueued_at)
+        self.__batch_sizes[len(batch)] += 1
+
+        try:
+            responses = await self.__executor.run(self.__generate, key, [request.text for request in batch])
+        except Exception as ex:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(ex)
+            return
+
+        for request, response in zip(batch, responses):
+            if not request.future.done():
+                request.future.set_result(response)
@@ -0,0 +1,50 @@
+import re
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def load_sentence_tokenizer():
+    # nltk is imported on first use and punkt is read only from the local nltk_data,
+    # nothing is downloaded at runtime; without it sentences are split by the untrained
+    # punkt rules, which still handle ordinary sentence endings
+    import nltk
+    from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+    try:
+        return nltk.data.load('tokenizers/punkt/english.pickle')
+    except LookupError:
+        print("NLTK punkt model is not installed, falling back to the untrained punkt tokenizer")
+        return PunktSentenceTokenizer()
+
+
+def split_into_sentences(text: str) -> tuple:
+    """
+        Splits text into sentences with the NLTK punkt tokenizer, line by line,
+        so bullet lists and paragraphs of a resume stay separate sentences.
+        Returns the sentences and the original text around them
+        (separators[0] precedes the first sentence, separators[i + 1] follows sentence i),
+        so stitch_sentences() can restore the layout.
+    """
+    tokenizer = load_sentence_tokenizer()
+
+    spans = []
+    for line in re.finditer(r"[^\s][^\n]*", text):
+        for start, end in tokenizer.span_tokenize(line.group()):
+            spans.append((line.start() + start, line.start() + end))
+
+    sentences = [text[start:end] for start, end in spans]
+    separators = []
+    previous_end = 0
+    for start, end in spans:
+        separators.append(text[previous_end:start])
+        previous_end = end
+    separators.append(text[previous_end:])
+    return sentences, separators
+
+
+def stitch_sentences(sentences: list, separators: list) -> str:
+    parts = [separators[0]]
+    for sentence, separator in zip(sentences, separators[1:]):
+        parts.append(sentence)
+        parts.append(separator)
+    return "".join(parts)
@@ -28,7 +28,7 @@ class AuthRouter():
         # unpack and serialize the instance 
         user_data = DtoUsers(**user_data).model_dump()
         user_data.pop("user_id", None)
-        user_data["password"] = authService.get_password_hash(user_data["password"])
+        user_data["password"] = await authService.get_password_hash(user_data["password"])
 
         social_data = data.get("social_media_links_data", {})
         social_data = DtoSocialMediaLinks(**social_data).model_dump()
@@ -52,8 +52,17 @@ class AuthRouter():
         if (user is None):
             raise HTTPException(status_code=404, detail=str("User is not found!"))
         user_data = user.model_dump()
-        if user_data is None or not authService.verify_password(form_data.password, user_data["password"]):
+        if user_data is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        verified, new_hash = await authService.verify_and_update(form_data.password, user_data["password"])
+        if not verified:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        if new_hash is not None:
+            # BCRYPT_ROUNDS changed since the password was stored, the login is not failed if saving doesn't work
+            try:
+                await prisma.users.update(where={"user_id": user.user_id}, data={"password": new_hash})
+            except Exception as ex:
+                print(f"Password rehash failed: {ex}")
         # access_token_expires = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")))
         access_token_expires = timedelta.max
         access_token = authService.create_access_token(data={"sub": user_data["email"],
@@ -1,13 +1,15 @@
+from typing import Optional
 from fastapi import HTTPException, WebSocketDisconnect
-from app.decorators.auth_decorators import check_roles
+from app.decorators.auth_decorators import Principal, check_roles, get_principal
 from app.dtos.dto_chat_users import DtoChatUsers
 from app.dtos.dto_chats import DtoChats
 from app.prisma.prisma import prisma
-from fastapi_pagination import Page, paginate
+from app.dtos.dto_pages import DtoKeysetPage
 from app.routers.auth_router import oauth2_scheme
 from app.services.auth_service import AuthService
 from app.services.chat_service import ChatService
 from app.services.user_service import UserService
+from app.utils.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 
 from fastapi import (
     APIRouter,
@@ -54,53 +56,37 @@ manager = ConnectionManager()
 
 class ChatRouter():
     @router.post("/create")
-    async def create_chat(data: DtoChats, token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def create_chat(data: DtoChats, principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         return await ChatService.create_chat(data, user_id)
         
     @router.delete("/delete/{chat_id}")
     @check_roles(["Administrator", "Employer"])
-    async def delete_chat(chat_id, token: str = Depends(oauth2_scheme)):
+    async def delete_chat(chat_id, principal: Principal = Depends(get_principal)):
         return await ChatService.delete_chat(chat_id)
         
     @router.post("/add")
-    async def add_user_to_chat(data: DtoChatUsers, token: str = Depends(oauth2_scheme)):
+    async def add_user_to_chat(data: DtoChatUsers, principal: Principal = Depends(get_principal)):
         return await ChatService.add_user_to_chat(data)
 
     @router.delete("/remove")
     @check_roles(["Administrator", "Employer"])
-    async def remove_user_from_chat(data: DtoChatUsers, token: str = Depends(oauth2_scheme)):
+    async def remove_user_from_chat(data: DtoChatUsers, principal: Principal = Depends(get_principal)):
         return await ChatService.remove_user_from_chat(data)
 
-    @router.get("/list", response_model=Page[DtoChats])
+    @router.get("/list", response_model=DtoKeysetPage[DtoChats])
     @check_roles(["Administrator"])
-    async def list_chats(filtration: str, token: str = Depends(oauth2_scheme)):
-        match filtration:
-            case "none":
-                chats = await prisma.chats.find_many(
-                    include={
-                        'chat_users': True            
-                    })
-            case "teams":
-                chats = await prisma.chats.find_many(
-                    where={
-                        'type': 'team chat'
-                    },
-                    include={
-                        'chat_users': True            
-                    })
-            case "techs":
-                chats = await prisma.chats.find_many(
-                    where={
-                        'type': 'technical support'
-                    },
-                    include={
-                        'chat_users': True            
-                    })
-        return paginate(chats)
+    async def list_chats(
+        filtration: str,
+        principal: Principal = Depends(get_principal),
+        size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+    ):
+        return await ChatService.get_chats(filtration, size, cursor, include_total)
 
     @router.get("/check/{user_id}")
-    async def check_chat_exisiting(user_id: str, token: str = Depends(oauth2_scheme)):
+    async def check_chat_exisiting(user_id: str, principal: Principal = Depends(get_principal)):
         try:
             chat_existing = await prisma.chats.find_first_or_raise(
                         where={
@@ -121,19 +107,18 @@ class ChatRouter():
             raise HTTPException(status_code=404, detail="Chat not found")
         
     @router.get("/check-team-chat/{team_id}")
-    async def check_team_chat_exisiting(team_id: str, token: str = Depends(oauth2_scheme)):
+    async def check_team_chat_exisiting(team_id: str, principal: Principal = Depends(get_principal)):
         try:
-            payload = AuthService().decode_token(token)
             chat_existing = await prisma.chats.find_first_or_raise(
                         where={
                             "type": "team chat",
                             "team_id_fk": team_id
                         })
             
-            if payload["role_id_fk"] == 1:
+            if principal.role_id == 1:
                 return chat_existing
             
-            user_id = await UserService.get_user_id_by_email(email=payload["sub"])
+            user_id = {"user_id": principal.user_id}
 
             try:
                 user_owner = await prisma.teams.find_first_or_raise(where={"team_id": team_id, "owner_id_fk": user_id["user_id"]})
@@ -176,22 +161,19 @@ class ChatRouter():
             return chat
 
     @router.get("/{chat_id}")
-    async def get(chat_id, token: str = Depends(oauth2_scheme)):
+    async def get(chat_id, principal: Principal = Depends(get_principal)):
         try:
             chat_existing = await prisma.chats.find_first_or_raise(where={"chat_id": chat_id})
         except Exception as ex:
             raise HTTPException(status_code=404, detail="Chat not found")
 
         try:
-            payload = AuthService().decode_token(token)
-            print(payload)
-            role = await UserService.get_role_by_email(role_id=payload["role_id_fk"])
-            print(role)
-            if(role["role"] == "Administrator"):
-                user_id = await UserService.get_user_id_by_email(email=payload["sub"])
+            print(principal)
+            if(principal.role == "Administrator"):
+                user_id = {"user_id": principal.user_id}
                 return {"message": "Welcome, Administrator!", "chat_id": chat_id, "user_role": "Administrator", "user_id": user_id["user_id"], "chat_name": chat_existing.name}
             else:
-                user_id = await UserService.get_user_id_by_email(email=payload["sub"])
+                user_id = {"user_id": principal.user_id}
                 check_access = await prisma.chat_users.find_first_or_raise(where={"chat_id": chat_id ,"user_id": user_id["user_id"]})
                 print(check_access)
                 return {"message": "Welcome, User!", "chat_id": chat_id, "user_role": "User", "access_info": check_access, "user_id": user_id["user_id"], "chat_name": chat_existing.name}
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+import json
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from dependency_injector.wiring import inject, Provide
-from app.decorators.auth_decorators import check_roles
+from app.decorators.auth_decorators import Principal, check_roles, get_principal
 from app.models.llm_models_schemas import RequestModel
-from app.routers.auth_router import oauth2_scheme
 
 router = APIRouter(
     prefix='/llm'
@@ -14,16 +15,150 @@ class LLMRouter():
     @check_roles(["Administrator", "Applicant"])
     @inject
     async def paraphrase(
+            request: Request,
             request_body: RequestModel,
-            token: str = Depends(oauth2_scheme),
-            model=Depends(Provide['beautify_model'])
+            principal: Principal = Depends(get_principal),
+            service=Depends(Provide['paraphrase_service']),
+            admission=Depends(Provide['paraphrase_admission']),
+            jobs=Depends(Provide['paraphrase_jobs'])
     ) -> JSONResponse:
         text = request_body.query
         mode = request_body.mode
         temp = request_body.temp
         num_return_sequences = request_body.num_return_sequences
         print(request_body)
-        resp = model.get_response(text, mode, temp, num_return_sequences)
-        response = JSONResponse(content={'response': resp, })
+        # 503 + Retry-After when too many requests are in flight, 504 past the deadline;
+        # queued work is dropped if the client disconnects or the deadline passes
+        resp = await admission.run(
+            request,
+            lambda: service.paraphrase(text, mode, temp, num_return_sequences,
+                                       allow_cached_sampling=request_body.allow_cached_sampling,
+                                       long_text=request_body.long_text),
+            request_body.deadline_seconds
+        )
+        if mode == 'fast' and request_body.prefetch_upgrade:
+            # the high-quality tier is computed in the background, the frontend swaps it in
+            # when the job is done (or gets it from the cache with mode='default')
+            upgrade = await jobs.submit(principal.email, text, 'default', temp,
+                                        num_return_sequences, long_text=request_body.long_text)
+            resp["upgrade_job_id"] = upgrade["id"]
+        response = JSONResponse(content=resp)
 
         return response
+
+    @router.post('/paraphrase/stream')
+    @check_roles(["Administrator", "Applicant"])
+    @inject
+    async def paraphrase_stream(
+            request: Request,
+            request_body: RequestModel,
+            principal: Principal = Depends(get_principal),
+            service=Depends(Provide['paraphrase_service']),
+            admission=Depends(Provide['paraphrase_admission'])
+    ) -> StreamingResponse:
+        # Server-Sent Events: "candidate" events with the partial text of every candidate,
+        # then a single "done" event with the validated response (only "done" unless mode='sample').
+        # Admitted like /llm/paraphrase: 503 + Retry-After when full, an "error" event past the deadline
+        stream, release = admission.admit_stream(
+            service.stream(request_body.query, request_body.mode, request_body.temp,
+                           request_body.num_return_sequences, request_body.deadline_seconds),
+            request_body.deadline_seconds
+        )
+
+        async def events():
+            async for event, data in stream:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                                 background=BackgroundTask(release))
+
+    @router.post('/jobs')
+    @check_roles(["Administrator", "Applicant"])
+    @inject
+    async def submit_job(
+            request_body: RequestModel,
+            principal: Principal = Depends(get_principal),
+            jobs=Depends(Provide['paraphrase_jobs'])
+    ) -> JSONResponse:
+        # background priority: the job runs after every interactive request, poll or subscribe for the result
+        job = await jobs.submit(principal.email, request_body.query, request_body.mode,
+                                request_body.temp, request_body.num_return_sequences,
+                                allow_cached_sampling=request_body.allow_cached_sampling,
+                                long_text=request_body.long_text)
+        return JSONResponse(content=job, status_code=202)
+
+    @router.get('/jobs/{job_id}')
+    @check_roles(["Administrator", "Applicant"])
+    @inject
+    async def get_job(
+            job_id: str,
+            principal: Principal = Depends(get_principal),
+            jobs=Depends(Provide['paraphrase_jobs'])
+    ) -> JSONResponse:
+        is_admin = principal.role == "Administrator"
+        return JSONResponse(content=await jobs.get(job_id, principal.email, is_admin))
+
+    @router.delete('/jobs/{job_id}')
+    @check_roles(["Administrator", "Applicant"])
+    @inject
+    async def cancel_job(
+            job_id: str,
+            principal: Principal = Depends(get_principal),
+            jobs=Depends(Provide['paraphrase_jobs'])
+    ) -> JSONResponse:
+        is_admin = principal.role == "Administrator"
+        return JSONResponse(content=await jobs.cancel(job_id, principal.email, is_admin))
+
+    @router.get('/jobs/{job_id}/events')
+    @check_roles(["Administrator", "Applicant"])
+    @inject
+    async def job_events(
+            job_id: str,
+            principal: Principal = Depends(get_principal),
+            jobs=Depends(Provide['paraphrase_jobs'])
+    ) -> StreamingResponse:
+        # Server-Sent Events: "status" right away, then "done" when the job is finished
+        is_admin = principal.role == "Administrator"
+        events = jobs.events(job_id, principal.email, is_admin)
+        # the first event is taken here, so a missing job is a 404 and not a broken stream
+        first_event = await events.__anext__()
+
+        async def stream():
+            event, data = first_event
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            async for event, data in events:
+                if event == "keepalive":
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @router.get('/ready')
+    @inject
+    async def ready(
+            service=Depends(Provide['paraphrase_service'])
+    ) -> JSONResponse:
+        # readiness probe, no auth: 503 until the model is loaded and warmed up
+        readiness = service.readiness()
+        return JSONResponse(content=readiness, status_code=200 if readiness["ready"] else 503)
+
+    @router.get('/stats')
+    @check_roles(["Administrator"])
+    @inject
+    async def stats(
+            principal: Principal = Depends(get_principal),
+            service=Depends(Provide['paraphrase_service']),
+            executor=Depends(Provide['inference_executor']),
+            admission=Depends(Provide['paraphrase_admission']),
+            jobs=Depends(Provide['paraphrase_jobs']),
+            precompute=Depends(Provide['paraphrase_precompute'])
+    ) -> JSONResponse:
+        stats = service.stats()
+        stats['executor'] = executor.stats()
+        stats['admission'] = admission.stats()
+        stats['jobs'] = await jobs.stats()
+        stats['precompute'] = precompute.stats()
+        return JSONResponse(content=stats)
@@ -1,10 +1,10 @@
 from math import e
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends, status, APIRouter
+from fastapi import FastAPI, HTTPException, Depends, status, APIRouter, Query
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
-from fastapi_pagination import Page, paginate
-from app.decorators.auth_decorators import check_roles
+from app.dtos.dto_pages import DtoKeysetPage
+from app.decorators.auth_decorators import Principal, check_roles, get_principal
 from app.prisma.prisma import prisma
 from app.dtos.dto_resumes import DtoResumes
 import os
@@ -12,8 +12,10 @@ from app.services.auth_service import AuthService
 from app.services.resume_service import ResumeService
 from app.services.user_service import UserService
 from app.services.pdf_service import PDFBuilder
+from app.services.statistics_service import statistics_service
 from app.routers.auth_router import oauth2_scheme
 from fastapi.responses import FileResponse
+from app.utils.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 
 router = APIRouter(
     prefix='/resume'
@@ -24,36 +26,40 @@ authService = AuthService()
 class ResumeRouter():
     @router.post("/create/")
     @check_roles(["Administrator", "Applicant"])
-    async def create_resume(data: dict, token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def create_resume(data: dict, principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         return await ResumeService.create_resume(ResumeService, data, user_id["user_id"])
 
     @router.put("/update/")
     @check_roles(["Administrator", "Applicant"])
-    async def update_resume(data: dict, token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def update_resume(data: dict, principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         return await ResumeService.update_resume(ResumeService, data, user_id["user_id"])
 
     @router.delete("/delete/{resume_id}")
     @check_roles(["Administrator"])
-    async def delete_resume(resume_id, token: str = Depends(oauth2_scheme)):
+    async def delete_resume(resume_id, principal: Principal = Depends(get_principal)):
         return await ResumeService.delete_resume(resume_id)
 
-    @router.get("/list/", response_model=Page[DtoResumes])
+    @router.get("/list/", response_model=DtoKeysetPage[DtoResumes])
     @check_roles(["Administrator", "Employer", "Applicant"])
     async def list_resumes(
-        token: str = Depends(oauth2_scheme),
+        principal: Principal = Depends(get_principal),
         minExperience: Optional[float] = 0.0,
         maxExperience: Optional[float] = 99.0,
         experience: Optional[str] = None,
         programming_language: Optional[str] = None,
+        size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        cursor: Optional[str] = None,
+        include_total: bool = False,
     ):
-        resumes = await ResumeService.get_resumes(ResumeService, minExperience=minExperience, maxExperience=maxExperience, experience=experience, programming_language=programming_language)
-        return paginate(resumes)
+        return await ResumeService.get_resumes(ResumeService, minExperience=minExperience, maxExperience=maxExperience,
+                                               experience=experience, programming_language=programming_language,
+                                               size=size, cursor=cursor, include_total=include_total)
 
     @router.get("/pdf/{user_id}")
     @check_roles(["Administrator", "Employer", "Applicant"])
-    async def create_pdf_resume(user_id, token: str = Depends(oauth2_scheme)):
+    async def create_pdf_resume(user_id, principal: Principal = Depends(get_principal)):
         try:
             user_data = await prisma.users.find_unique(where={"user_id": user_id})
         except Exception as ex:
@@ -107,8 +113,8 @@ class ResumeRouter():
         
     @router.get("/userResume/")
     @check_roles(["Administrator", "Applicant"])
-    async def get_user_resume(token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def get_user_resume(principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         try:
             resume = await prisma.resumes.find_first_or_raise(where={"user_id_fk": user_id["user_id"]})
             skills = await prisma.skills.find_first_or_raise(
@@ -132,16 +138,12 @@ class ResumeRouter():
 
     @router.get("/statistics")
     @check_roles(["Administrator", "Employer", "Applicant"])
-    async def get_statistics(token: str = Depends(oauth2_scheme)):
-        languages_hired_statistics = await ResumeService.get_hired_applicants_languages()
-        languages_resumes_statistics = await ResumeService.get_resumes_languages()
-        experiences_statistics = await ResumeService.get_resumes_experiences()
-        return {"languages_hired_statistics": languages_hired_statistics,
-                    "languages_resumes_statistics":languages_resumes_statistics,
-                    "experiences_statistics":experiences_statistics}
+    async def get_statistics(principal: Principal = Depends(get_principal)):
+        # counters maintained by the database triggers, see StatisticsService
+        return await statistics_service.read()
 
     @router.get("/get-resume/{resume_id}")
     @check_roles(["Administrator", "Employer", "Applicant"])
-    async def get_resume_by_resume_id(resume_id, token: str = Depends(oauth2_scheme)):
+    async def get_resume_by_resume_id(resume_id, principal: Principal = Depends(get_principal)):
         test = await ResumeService.get_resume_by_resume_id(resume_id)
         return test
@@ -1,8 +1,9 @@
-from fastapi import FastAPI, HTTPException, Depends, status, APIRouter
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Depends, status, APIRouter, Query
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
-from fastapi_pagination import Page, paginate
-from app.decorators.auth_decorators import check_roles
+from app.dtos.dto_pages import DtoKeysetPage
+from app.decorators.auth_decorators import Principal, check_roles, get_principal
 from app.dtos.dto_teams import DtoTeams
 from app.prisma.prisma import prisma
 import os
@@ -10,6 +11,9 @@ from app.services.auth_service import AuthService
 from app.services.team_service import TeamService
 from app.services.user_service import UserService
 from app.routers.auth_router import oauth2_scheme
+from app.utils.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from app.services.candidate_index import candidate_index
+from app.configuration.candidate_settings import CANDIDATES_DEFAULT, CANDIDATES_MAX
 
 router = APIRouter(
     prefix='/team'
@@ -18,37 +22,57 @@ router = APIRouter(
 class TeamRouter():
     @router.post("/create/")
     @check_roles(["Employer"])
-    async def create_team(data: DtoTeams, token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def create_team(data: DtoTeams, principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         return await TeamService.create_team(data, user_id)
 
     @router.put("/update/")
     @check_roles(["Employer"])   
-    async def update_team(data: DtoTeams, token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def update_team(data: DtoTeams, principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         return await TeamService.update_team(data, user_id)
 
     @router.delete("/delete/{team_id}")
     @check_roles(["Administrator", "Employer"])
-    async def delete_team(team_id, token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def delete_team(team_id, principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         return await TeamService.delete_team(team_id, user_id)
 
-    @router.get("/list/", response_model=Page[DtoTeams])
+    @router.get("/list/", response_model=DtoKeysetPage[DtoTeams])
     @check_roles(["Administrator", "Employer"])
-    async def list_teams(token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
-        return paginate(await TeamService.get_teams(user_id))
+    async def list_teams(
+        principal: Principal = Depends(get_principal),
+        size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+    ):
+        user_id = {"user_id": principal.user_id}
+        return await TeamService.get_teams(user_id, size, cursor, include_total)
+
+    @router.get("/candidates/stats")
+    @check_roles(["Administrator"])
+    async def candidates_stats(principal: Principal = Depends(get_principal)):
+        return candidate_index.stats()
+
+    @router.get("/{team_id}/candidates")
+    @check_roles(["Administrator", "Employer"])
+    async def list_candidates(
+        team_id,
+        principal: Principal = Depends(get_principal),
+        limit: int = Query(CANDIDATES_DEFAULT, ge=1, le=CANDIDATES_MAX),
+    ):
+        # applicants ranked by how many of the team languages they have, then by experience in them
+        return await TeamService.get_candidates(team_id, principal, limit)
 
     @router.get("/get-team/{team_id}")
     @check_roles(["Applicant"])
-    async def list_membership_team(team_id, token: str = Depends(oauth2_scheme)):
+    async def list_membership_team(team_id, principal: Principal = Depends(get_principal)):
         response = await prisma.teams.find_unique(where={"team_id": team_id})
         return response
 
     @router.get("/get-teams")
     @check_roles(["Employer"])
-    async def list_membership(token: str = Depends(oauth2_scheme)):
-        user_id = await UserService.get_user_id_by_email(email=AuthService().get_email_from_token(token))
+    async def list_membership(principal: Principal = Depends(get_principal)):
+        user_id = {"user_id": principal.user_id}
         response = await prisma.teams.find_many(where={"owner_id_fk": user_id["user_id"]})
         return response
\ No newline at end of file
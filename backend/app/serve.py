@@ -0,0 +1,137 @@
+"""
+    Production serving mode. The master process loads the paraphrase model once, freezes
+    the heap and forks the workers, so every worker shares the weights copy-on-write
+    instead of loading its own copy. Workers accept connections on one listening socket,
+    run the application lifespan on their own (Prisma connection, inference executor,
+    warmup) and get an equal share of the CPU cores for torch. The master only watches
+    the workers: it restarts crashed ones with a backoff, gives up on a worker that keeps
+    crashing, and forwards SIGINT/SIGTERM on shutdown.
+
+    SERVE_WORKERS=4 python -m app.serve
+"""
+import os
+import gc
+import time
+import signal
+import socket
+import uvicorn
+from fastapi import FastAPI
+from app.configuration.llm_settings import LLM_WORKERS, LLM_TORCH_THREADS
+from app.configuration.serve_settings import SERVE_HOST, SERVE_PORT, SERVE_WORKERS, \
+    SERVE_RESTART_MAX_BACKOFF_SECONDS, SERVE_MAX_RESTARTS
+from app.application import app
+
+
+def partition_torch_threads(processes: int, executor_workers: int) -> int:
+    # every executor worker of every process gets its own cores
+    if LLM_TORCH_THREADS > 0:
+        return LLM_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // (processes * max(1, executor_workers)))
+
+
+def preload_model(application: FastAPI):
+    from app.models.llm_models import limit_torch_threads
+
+    # the master never runs inference; with a single thread torch doesn't start an OpenMP
+    # pool, which the forked workers couldn't use
+    limit_torch_threads(1)
+    started = time.perf_counter()
+    application.container.beautify_model()
+    print(f"Model is loaded in the master process in {time.perf_counter() - started:.1f}s")
+
+    # objects created so far are never collected, so the collector doesn't write
+    # into their pages and break copy-on-write sharing
+    gc.collect()
+    gc.freeze()
+
+
+class PreforkServer:
+    def __init__(self, application: FastAPI, host: str, port: int, workers: int):
+        self.__config = uvicorn.Config(application, host=host, port=port, lifespan="on")
+        self.__workers_count = workers
+        self.__workers: dict[int, int] = {}
+        # worker number -> start time and crashes in a row
+        self.__started_at: dict[int, float] = {}
+        self.__crashes: dict[int, int] = {}
+        self.__stopping = False
+        self.exit_code = 0
+
+    def run(self):
+        listener = self.__config.bind_socket()
+        signal.signal(signal.SIGINT, self.__stop)
+        signal.signal(signal.SIGTERM, self.__stop)
+
+        for number in range(self.__workers_count):
+            self.__spawn(number, listener)
+
+        while self.__workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            number = self.__workers.pop(pid, None)
+            if number is None or self.__stopping:
+                continue
+            # a worker that ran for a while had a one-off failure, not a startup crash loop
+            if time.monotonic() - self.__started_at[number] >= 60:
+                self.__crashes[number] = 0
+            self.__crashes[number] = self.__crashes.get(number, 0) + 1
+            if self.__crashes[number] > SERVE_MAX_RESTARTS:
+                print(f"Worker {number} (pid {pid}) exited with status {status}, "
+                      f"{self.__crashes[number]} crashes in a row, stopping the server")
+                self.exit_code = 1
+                self.__stop(signal.SIGTERM, None)
+                continue
+            backoff = min(SERVE_RESTART_MAX_BACKOFF_SECONDS, 2 ** (self.__crashes[number] - 1))
+            print(f"Worker {number} (pid {pid}) exited with status {status}, restarting in {backoff:g}s")
+            time.sleep(backoff)
+            if not self.__stopping:
+                self.__spawn(number, listener)
+
+        listener.close()
+        print("All workers are stopped")
+
+    def __spawn(self, number: int, listener: socket.socket):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # lets the application tell the workers apart, e.g. to run singleton background jobs once
+            os.environ["SERVE_WORKER_NUMBER"] = str(number)
+            exit_code = 0
+            try:
+                print(f"Worker {number} (pid {os.getpid()}) is starting")
+                uvicorn.Server(self.__config).run(sockets=[listener])
+            except BaseException as ex:
+                print(f"Worker {number} failed: {ex}")
+                exit_code = 1
+            finally:
+                # never fall back into the master's loop
+                os._exit(exit_code)
+        self.__workers[pid] = number
+        self.__started_at[number] = time.monotonic()
+
+    def __stop(self, signum, frame):
+        self.__stopping = True
+        for pid in self.__workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main():
+    workers = SERVE_WORKERS if SERVE_WORKERS > 0 else (os.cpu_count() or 1)
+    torch_threads = partition_torch_threads(workers, LLM_WORKERS)
+    # the inference executor is created by every worker's lifespan, with its share of the cores
+    app.container.inference_executor.add_kwargs(torch_threads=torch_threads)
+    print(f"Starting {workers} workers, {LLM_WORKERS} inference threads x {torch_threads} torch threads each")
+
+    preload_model(app)
+    server = PreforkServer(app, SERVE_HOST, SERVE_PORT, workers)
+    server.run()
+    raise SystemExit(server.exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,22 +6,39 @@ import jwt
 import jwt.exceptions as jwtExceptions
 from app.prisma.prisma import prisma
 import os
+from typing import Optional, Tuple
 from dotenv import load_dotenv
+from app.configuration.auth_settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
 from app.services.user_service import UserService
+from app.utils.executors import BoundedExecutor
 
 dotenv_path = 'app/.env'
 
+if os.path.exists(dotenv_path):
+    load_dotenv(dotenv_path, override=False)
+
+# min = max = default rounds, so a hash made with another cost factor needs an update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto",
+                           bcrypt__default_rounds=BCRYPT_ROUNDS,
+                           bcrypt__min_rounds=BCRYPT_ROUNDS,
+                           bcrypt__max_rounds=BCRYPT_ROUNDS)
+
+# bcrypt costs hundreds of milliseconds of CPU per call, it must not run on the event loop
+password_hash_executor = BoundedExecutor("password-hash", PASSWORD_HASH_WORKERS)
+
 class AuthService:
-    def __init__(self):
-        self.__pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        if os.path.exists(dotenv_path):
-            load_dotenv(dotenv_path, override=False)
+    async def get_password_hash(self, password):
+        return await password_hash_executor.run(pwd_context.hash, password)
+
+    async def verify_password(self, plain_password, hashed_password):
+        return await password_hash_executor.run(pwd_context.verify, plain_password, hashed_password)
 
-    def get_password_hash(self, password):
-        return self.__pwd_context.hash(password)
+    async def verify_and_update(self, plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+        # (is valid, new hash to store when the stored one uses an outdated cost factor)
+        return await password_hash_executor.run(pwd_context.verify_and_update, plain_password, hashed_password)
 
-    def verify_password(self, plain_password, hashed_password):
-        return self.__pwd_context.verify(plain_password, hashed_password)
+    def hashing_stats(self) -> dict:
+        return password_hash_executor.stats()
 
     def create_access_token(self, data: dict, expires_delta: timedelta = None):
         to_encode = data.copy()
@@ -0,0 +1,143 @@
+import time
+import asyncio
+from typing import Callable, Optional
+from app.configuration.candidate_settings import CANDIDATE_EXPERIENCE_CAP_YEARS, CANDIDATE_INDEX_REFRESH_SECONDS
+from app.models.candidate_rows import CandidateRows, canonical_language
+from app.prisma.prisma import prisma
+from app.utils.metrics import LatencyWindow
+
+# visible resumes with their languages and the longest experience in each of them
+CANDIDATES_QUERY = """
+    SELECT r.resume_id::text AS resume_id, r.user_id_fk::text AS user_id_fk, r.title,
+           array_agg(l.programming_language) AS languages,
+           array_agg(l.experience) AS experiences
+    FROM resumes r
+    JOIN (
+        SELECT s.resume_id_fk, pl.programming_language,
+               COALESCE(MAX(e.experience), 0)::float8 AS experience
+        FROM skills s
+        JOIN programming_languages pl ON pl.skill_id_fk = s.skill_id
+        LEFT JOIN experiences e ON e.programming_language_id_fk = pl.programming_language_id
+        GROUP BY s.resume_id_fk, pl.programming_language
+    ) l ON l.resume_id_fk = r.resume_id
+    WHERE r.visibility = 'visible'
+    GROUP BY r.resume_id
+"""
+
+
+def parse_team_languages(important_languages: Optional[str]) -> list:
+    # comma separated as teams store them, blanks and repeats are dropped
+    if not important_languages:
+        return []
+    languages = {}
+    for language in important_languages.split(','):
+        if language.strip():
+            languages.setdefault(canonical_language(language), language.strip())
+    return list(languages.values())
+
+
+class CandidateIndex:
+    """
+        In-memory index of the visible resumes for matching applicants to team languages,
+        a match is a vectorized scan of the CandidateRows arrays without a database query.
+        Resume writes update the index right away, the rebuild loop reloads it from the
+        database to pick up the writes of the other app.serve workers.
+    """
+    def __init__(self, experience_cap: float = CANDIDATE_EXPERIENCE_CAP_YEARS,
+                 refresh_seconds: float = CANDIDATE_INDEX_REFRESH_SECONDS):
+        self.__experience_cap = experience_cap
+        self.__refresh_seconds = refresh_seconds
+        self.__rows = CandidateRows()
+        self.__loaded = False
+        self.__load_lock = asyncio.Lock()
+        # changes made while a rebuild query runs, replayed on top of its result
+        self.__pending: Optional[list] = None
+        self.__task: Optional[asyncio.Task] = None
+        self.__rebuilds = 0
+        self.__last_rebuild_seconds: Optional[float] = None
+        self.__last_error: Optional[str] = None
+        self.__matches = LatencyWindow()
+
+    def upsert(self, resume_id: str, user_id: Optional[str], title: str, visibility: str, languages: dict):
+        # languages: programming language -> years of experience (or None)
+        if visibility != "visible":
+            self.remove(resume_id)
+            return
+        self.__apply(lambda rows: rows.upsert(str(resume_id), user_id and str(user_id), title, languages))
+
+    def remove(self, resume_id: str):
+        self.__apply(lambda rows: rows.remove(str(resume_id)))
+
+    def remove_user(self, user_id: str):
+        self.__apply(lambda rows: rows.remove_user(str(user_id)))
+
+    async def candidates(self, languages: list, limit: int, exclude_users=()) -> list:
+        if not self.__loaded:
+            await self.rebuild()
+        started = time.perf_counter()
+        result = self.__rows.match(languages, limit, self.__experience_cap, exclude_users)
+        self.__matches.add(time.perf_counter() - started)
+        return result
+
+    async def rebuild(self, force: bool = False):
+        async with self.__load_lock:
+            if self.__loaded and not force:
+                return
+            started = time.perf_counter()
+            self.__pending = []
+            try:
+                records = await prisma.query_raw(CANDIDATES_QUERY)
+                rows = CandidateRows(capacity=max(1024, len(records)))
+                for record in records:
+                    rows.upsert(record["resume_id"], record["user_id_fk"], record["title"],
+                                dict(zip(record["languages"], record["experiences"])))
+                for change in self.__pending:
+                    change(rows)
+            finally:
+                self.__pending = None
+            self.__rows = rows
+            self.__loaded = True
+            self.__rebuilds += 1
+            self.__last_rebuild_seconds = round(time.perf_counter() - started, 3)
+
+    def start(self):
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.get_running_loop().create_task(self.__loop())
+
+    async def close(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    async def __loop(self):
+        while True:
+            try:
+                await self.rebuild(force=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.__last_error = str(ex)
+                print(f"Candidate index rebuild failed: {ex}")
+            await asyncio.sleep(self.__refresh_seconds)
+
+    def __apply(self, change: Callable):
+        change(self.__rows)
+        if self.__pending is not None:
+            self.__pending.append(change)
+
+    def stats(self) -> dict:
+        rows = self.__rows
+        return {
+            "loaded": self.__loaded,
+            "resumes": len(rows.rows),
+            "languages": len(rows.language_names),
+            "memory_bytes": rows.bits.nbytes + rows.experience.nbytes,
+            "rebuilds": self.__rebuilds,
+            "last_rebuild_seconds": self.__last_rebuild_seconds,
+            "last_error": self.__last_error,
+            "match_ms": self.__matches.summary(),
+        }
+
+
+candidate_index = CandidateIndex()
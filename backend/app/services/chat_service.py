@@ -1,3 +1,4 @@
+from typing import Optional
 import fastapi as fastapi
 import jwt as jwt
 from app.dtos.dto_users import DtoUsers
@@ -6,6 +7,14 @@ from app.dtos.dto_teams import DtoTeams
 from app.dtos.dto_team_members import DtoTeamMembers
 from fastapi import HTTPException
 from app.services.auth_service import AuthService
+from app.utils.pagination import PAGE_SIZE_DEFAULT, keyset_page
+
+# list filtration -> chat type
+chat_types = {
+    "none": None,
+    "teams": "team chat",
+    "techs": "technical support",
+}
 
 class ChatService:
     async def create_chat(data, user_id):
@@ -57,4 +66,29 @@ class ChatService:
             )
             return {"message": "Removing user from chat successfully"}
         except Exception as e:
-            raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=400, detail=str(e))
+
+    async def get_chats(filtration: str, size: int = PAGE_SIZE_DEFAULT, cursor: Optional[str] = None,
+                        include_total: bool = False):
+        if filtration not in chat_types:
+            raise HTTPException(status_code=422, detail=f"Unknown filtration, expected one of {list(chat_types)}")
+        where = {"type": chat_types[filtration]} if chat_types[filtration] is not None else {}
+
+        async def fetch(after: Optional[str], take: int) -> list:
+            return await prisma.chats.find_many(
+                where={**where, "chat_id": {"gt": after}} if after is not None else where,
+                include={'chat_users': True},
+                order={"chat_id": "asc"},
+                take=take)
+
+        async def count() -> int:
+            return await prisma.chats.count(where=where)
+
+        try:
+            return await keyset_page(fetch, "chat_id", size, cursor,
+                                     count=count if include_total else None,
+                                     count_key=("chats", filtration))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
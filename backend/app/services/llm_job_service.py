@@ -0,0 +1,198 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException
+from app.configuration.llm_settings import LLM_JOB_RETENTION_SECONDS, LLM_JOBS_MAX_PENDING, LLM_JOB_POLL_SECONDS, \
+    LLM_JOB_HEARTBEAT_TIMEOUT_SECONDS
+from app.models.llm_scheduler import PRIORITY_BACKGROUND
+from app.services.llm_job_store import ParaphraseJobStore
+from app.services.llm_service import ParaphraseService
+
+
+def job_to_dict(job) -> dict:
+    return {
+        "id": job.job_id,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "cancel_requested": job.cancel_requested,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class ParaphraseJobService:
+    """
+        Background paraphrase jobs: submit returns a job id right away, the text goes through
+        the batch scheduler with background priority (after every interactive request) and
+        the result can be polled or awaited as an event. Jobs live in the paraphrase_jobs
+        table, so any process (app.serve worker, uvicorn worker, replica) answers for a job:
+        the process that accepted it runs it, refreshes its heartbeat and writes the result,
+        a cancellation from another process is picked up by polling. A pending job whose
+        heartbeat expired is failed, its process is gone. Finished jobs are kept for the
+        retention time, then deleted.
+    """
+    def __init__(self, paraphrase_service: ParaphraseService, store: ParaphraseJobStore,
+                 retention_seconds: float = LLM_JOB_RETENTION_SECONDS, max_pending: int = LLM_JOBS_MAX_PENDING,
+                 poll_seconds: float = LLM_JOB_POLL_SECONDS,
+                 heartbeat_timeout_seconds: float = LLM_JOB_HEARTBEAT_TIMEOUT_SECONDS):
+        self.__paraphrase_service = paraphrase_service
+        self.__store = store
+        self.__retention_seconds = retention_seconds
+        self.__max_pending = max(1, max_pending)
+        self.__poll_seconds = poll_seconds
+        self.__heartbeat_timeout_seconds = max(heartbeat_timeout_seconds, 3 * poll_seconds)
+        # unique per process, worker numbers repeat across uvicorn workers, containers and restarts
+        self.__worker = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # jobs run by this process
+        self.__tasks: dict[str, asyncio.Task] = {}
+        self.__watcher: Optional[asyncio.Task] = None
+        self.__pruned_at = 0.0
+        self.__submitted = 0
+        self.__failed = 0
+
+    async def start(self):
+        failed = await self.__fail_expired()
+        if failed:
+            print(f"{failed} paraphrase jobs of stopped processes are marked as failed")
+
+    async def submit(self, owner: str, text: str, mode: str = 'default', temperature: float = 0.8,
+                     num_return_sequences: int = 3, allow_cached_sampling: bool = False,
+                     long_text: Optional[bool] = None) -> dict:
+        await self.__prune()
+        if await self.__store.count_pending() >= self.__max_pending:
+            raise HTTPException(status_code=503, detail="Too many paraphrase jobs are queued",
+                                headers={"Retry-After": "60"})
+
+        job = await self.__store.create(uuid.uuid4().hex, owner,
+                                        {"mode": mode, "temperature": temperature,
+                                         "num_return_sequences": num_return_sequences},
+                                        self.__worker, time.time())
+        self.__submitted += 1
+        self.__tasks[job.job_id] = asyncio.get_running_loop().create_task(
+            self.__run(job.job_id, text, mode, temperature, num_return_sequences, allow_cached_sampling, long_text))
+        if self.__watcher is None or self.__watcher.done():
+            self.__watcher = asyncio.get_running_loop().create_task(self.__watch_jobs())
+        return job_to_dict(job)
+
+    async def get(self, job_id: str, owner: str, is_admin: bool = False) -> dict:
+        return job_to_dict(await self.__find(job_id, owner, is_admin))
+
+    async def cancel(self, job_id: str, owner: str, is_admin: bool = False) -> dict:
+        job = await self.__find(job_id, owner, is_admin)
+        if job.status == "pending":
+            task = self.__tasks.get(job_id)
+            if task is not None:
+                task.cancel()
+                # the job stores its "cancelled" status on the way out
+                await asyncio.wait([task])
+                job = await self.__store.get(job_id)
+            else:
+                # run by another process, which cancels it on its next poll (cancel_requested until then)
+                job = await self.__store.request_cancel(job_id)
+        return job_to_dict(job)
+
+    async def events(self, job_id: str, owner: str, is_admin: bool = False,
+                     keepalive_seconds: float = 15) -> AsyncIterator[tuple]:
+        # ("status", job) right away, ("keepalive", None) while waiting, ("done", job) at the end
+        job = await self.__find(job_id, owner, is_admin)
+        yield "status", job_to_dict(job)
+        waited = 0.0
+        while job.status == "pending":
+            task = self.__tasks.get(job_id)
+            started = time.monotonic()
+            if task is not None:
+                # run here: woken up as soon as it's done
+                await asyncio.wait([task], timeout=keepalive_seconds - waited)
+            else:
+                await asyncio.sleep(min(self.__poll_seconds, keepalive_seconds - waited))
+            waited += time.monotonic() - started
+            job = await self.__store.get(job_id)
+            if job is not None and job.status == "pending" and job_id not in self.__tasks \
+                    and job.heartbeat_at < time.time() - self.__heartbeat_timeout_seconds:
+                await self.__fail_expired()
+                job = await self.__store.get(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            if job.status == "pending" and waited >= keepalive_seconds:
+                waited = 0.0
+                yield "keepalive", None
+        yield "done", job_to_dict(job)
+
+    async def close(self):
+        tasks = [task for task in self.__tasks.values() if not task.done()]
+        if self.__watcher is not None:
+            tasks.append(self.__watcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stats(self) -> dict:
+        return {
+            "running": len(self.__tasks),
+            "pending": await self.__store.count_pending(),
+            "max_pending": self.__max_pending,
+            "submitted": self.__submitted,
+            "failed": self.__failed,
+            "retention_seconds": self.__retention_seconds,
+        }
+
+    async def __run(self, job_id: str, text: str, mode: str, temperature: float,
+                    num_return_sequences: int, allow_cached_sampling: bool, long_text: Optional[bool]):
+        status, result, error = "failed", None, None
+        try:
+            result = await self.__paraphrase_service.paraphrase(
+                text, mode, temperature, num_return_sequences, allow_cached_sampling=allow_cached_sampling,
+                long_text=long_text, priority=PRIORITY_BACKGROUND)
+            status = "done"
+        except asyncio.CancelledError:
+            status = "cancelled"
+        except Exception as ex:
+            error = str(ex)
+            self.__failed += 1
+        finally:
+            try:
+                await self.__store.finish(job_id, status, result, error, time.time())
+            except Exception as ex:
+                print(f"Paraphrase job {job_id} result is not stored: {ex}")
+            self.__tasks.pop(job_id, None)
+
+    async def __watch_jobs(self):
+        # heartbeats of the jobs run here and cancellations requested through other processes,
+        # only while this process runs jobs
+        while self.__tasks:
+            await asyncio.sleep(self.__poll_seconds)
+            try:
+                await self.__store.heartbeat(self.__worker, list(self.__tasks), time.time())
+                cancelled = await self.__store.cancel_requested(list(self.__tasks))
+            except Exception as ex:
+                print(f"Paraphrase job heartbeats and cancellations are not updated: {ex}")
+                continue
+            for job_id in cancelled:
+                task = self.__tasks.get(job_id)
+                if task is not None:
+                    task.cancel()
+
+    async def __find(self, job_id: str, owner: str, is_admin: bool):
+        job = await self.__store.get(job_id)
+        # someone else's job is reported the same way as a missing one
+        if job is None or (job.owner != owner and not is_admin):
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+
+    async def __prune(self):
+        # finished jobs are deleted at most once per poll interval
+        now = time.time()
+        if now - self.__pruned_at < self.__poll_seconds:
+            return
+        self.__pruned_at = now
+        await self.__fail_expired()
+        await self.__store.delete_finished_before(now - self.__retention_seconds)
+
+    async def __fail_expired(self) -> int:
+        now = time.time()
+        return await self.__store.fail_expired(now - self.__heartbeat_timeout_seconds,
+                                               "The process running the job stopped", now)
@@ -0,0 +1,53 @@
+from typing import Optional
+from prisma import Json
+from app.prisma.prisma import prisma
+
+
+class ParaphraseJobStore:
+    """
+        Background paraphrase jobs in the paraphrase_jobs table, so every app.serve worker
+        sees the jobs accepted by the others.
+    """
+    async def create(self, job_id: str, owner: str, params: dict, worker: str, created_at: float):
+        return await prisma.paraphrase_jobs.create(data={
+            "job_id": job_id, "owner": owner, "params": Json(params),
+            "worker": worker, "created_at": created_at, "heartbeat_at": created_at
+        })
+
+    async def get(self, job_id: str):
+        return await prisma.paraphrase_jobs.find_unique(where={"job_id": job_id})
+
+    async def finish(self, job_id: str, status: str, result: Optional[dict], error: Optional[str],
+                     finished_at: float):
+        data = {"status": status, "error": error, "finished_at": finished_at}
+        if result is not None:
+            data["result"] = Json(result)
+        await prisma.paraphrase_jobs.update(where={"job_id": job_id}, data=data)
+
+    async def request_cancel(self, job_id: str):
+        await prisma.paraphrase_jobs.update_many(where={"job_id": job_id, "status": "pending"},
+                                                 data={"cancel_requested": True})
+        return await self.get(job_id)
+
+    async def heartbeat(self, worker: str, job_ids: list, heartbeat_at: float) -> int:
+        return await prisma.paraphrase_jobs.update_many(
+            where={"job_id": {"in": job_ids}, "worker": worker, "status": "pending"},
+            data={"heartbeat_at": heartbeat_at}
+        )
+
+    async def cancel_requested(self, job_ids: list) -> set:
+        jobs = await prisma.paraphrase_jobs.find_many(where={"job_id": {"in": job_ids}, "cancel_requested": True})
+        return {job.job_id for job in jobs}
+
+    async def count_pending(self) -> int:
+        return await prisma.paraphrase_jobs.count(where={"status": "pending"})
+
+    async def fail_expired(self, heartbeat_before: float, error: str, finished_at: float) -> int:
+        # pending jobs whose worker stopped sending heartbeats, it is gone and will never finish them
+        return await prisma.paraphrase_jobs.update_many(
+            where={"status": "pending", "heartbeat_at": {"lt": heartbeat_before}},
+            data={"status": "failed", "error": error, "finished_at": finished_at}
+        )
+
+    async def delete_finished_before(self, finished_at: float) -> int:
+        return await prisma.paraphrase_jobs.delete_many(where={"finished_at": {"lt": finished_at}})
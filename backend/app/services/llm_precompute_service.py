@@ -0,0 +1,139 @@
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+from app.configuration.llm_settings import (
+    LLM_PRECOMPUTE_INTERVAL_SECONDS,
+    LLM_PRECOMPUTE_PAGE_SIZE,
+    LLM_PRECOMPUTE_NUM_RETURN_SEQUENCES
+)
+from app.models.llm_cache import source_hash
+from app.models.llm_scheduler import ParaphraseBatchScheduler, PRIORITY_BACKGROUND
+from app.prisma.prisma import prisma
+from app.services.llm_service import ParaphraseService
+from app.services.llm_suggestion_store import ParaphraseSuggestionStore
+from app.utils.executors import BoundedExecutor
+
+
+class ParaphrasePrecomputeService:
+    """
+        Background pipeline that pages through visible resumes and paraphrases their titles
+        and texts while the model has nothing else to do (off by default, LLM_PRECOMPUTE_ENABLED). Texts whose hash already has
+        a stored suggestion are skipped, so every pass only computes what changed since the
+        previous one; suggestions no source refers to anymore are deleted after a full pass.
+    """
+    def __init__(self, paraphrase_service: ParaphraseService, store: ParaphraseSuggestionStore,
+                 scheduler: ParaphraseBatchScheduler, executor: BoundedExecutor,
+                 interval_seconds: float = LLM_PRECOMPUTE_INTERVAL_SECONDS,
+                 page_size: int = LLM_PRECOMPUTE_PAGE_SIZE,
+                 num_return_sequences: int = LLM_PRECOMPUTE_NUM_RETURN_SEQUENCES,
+                 mode: str = 'default', idle_poll_seconds: float = 1.0):
+        self.__paraphrase_service = paraphrase_service
+        self.__store = store
+        self.__scheduler = scheduler
+        self.__executor = executor
+        self.__interval_seconds = interval_seconds
+        self.__page_size = max(1, page_size)
+        self.__num_return_sequences = num_return_sequences
+        # only deterministic (beam search) output is worth storing
+        self.__mode = mode
+        self.__idle_poll_seconds = idle_poll_seconds
+        self.__task: Optional[asyncio.Task] = None
+        self.__passes = 0
+        self.__computed = 0
+        self.__skipped = 0
+        self.__deleted = 0
+        self.__last_pass_seconds: Optional[float] = None
+        self.__last_error: Optional[str] = None
+
+    def start(self):
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.get_running_loop().create_task(self.__loop())
+
+    async def close(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    async def run_pass(self):
+        started = time.perf_counter()
+        pass_started_at = datetime.now(timezone.utc)
+        last_resume_id = None
+        while True:
+            where = {"visibility": "visible"}
+            if last_resume_id is not None:
+                where["resume_id"] = {"gt": last_resume_id}
+            resumes = await prisma.resumes.find_many(where=where, order={"resume_id": "asc"}, take=self.__page_size)
+            if not resumes:
+                break
+            last_resume_id = resumes[-1].resume_id
+
+            texts = {}
+            for resume in resumes:
+                for text in (resume.title, resume.text):
+                    if text and text.strip():
+                        texts.setdefault(source_hash(text), text)
+            await self.__process_page(texts, pass_started_at)
+
+        # a full pass touched every suggestion that is still in use
+        self.__deleted += await self.__store.delete_not_seen_since(pass_started_at)
+        self.__passes += 1
+        self.__last_pass_seconds = round(time.perf_counter() - started, 3)
+
+    async def __process_page(self, texts: dict, seen_at: datetime):
+        hashes = list(texts)
+        existing = await self.__store.existing_hashes(hashes, self.__mode, self.__num_return_sequences)
+        if existing:
+            await self.__store.touch(list(existing), self.__mode, self.__num_return_sequences, seen_at)
+        self.__skipped += len(existing)
+
+        missing = [hash_ for hash_ in hashes if hash_ not in existing]
+        if not missing:
+            return
+
+        responses = {}
+        for hash_ in missing:
+            # one text at a time and only while nothing else runs, so an interactive request
+            # waits for at most one text's batch; the results go to the suggestions table only,
+            # never to the request cache where they would evict the entries of real users
+            await self.__wait_until_idle()
+            try:
+                result = await self.__paraphrase_service.paraphrase(
+                    texts[hash_], self.__mode, num_return_sequences=self.__num_return_sequences,
+                    priority=PRIORITY_BACKGROUND, use_cache=False)
+            except Exception as ex:
+                self.__last_error = str(ex)
+                continue
+            if not result["partial"]:
+                responses[hash_] = result["response"]
+        if responses:
+            await self.__store.save_many(responses, self.__mode, self.__num_return_sequences, seen_at)
+            self.__computed += len(responses)
+
+    async def __wait_until_idle(self):
+        # interactive traffic always wins, the pipeline only fills the gaps
+        while not self.__scheduler.is_idle() or self.__executor.stats()["active"] > 0:
+            await asyncio.sleep(self.__idle_poll_seconds)
+
+    async def __loop(self):
+        while True:
+            try:
+                await self.run_pass()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.__last_error = str(ex)
+                print(f"Paraphrase precompute pass failed: {ex}")
+            await asyncio.sleep(self.__interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.__task is not None and not self.__task.done(),
+            "passes": self.__passes,
+            "computed": self.__computed,
+            "skipped": self.__skipped,
+            "deleted": self.__deleted,
+            "last_pass_seconds": self.__last_pass_seconds,
+            "last_error": self.__last_error,
+        }
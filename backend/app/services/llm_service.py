@@ -0,0 +1,172 @@
+import time
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Optional
+from app.configuration.llm_settings import LLM_LONG_TEXT_MIN_CHARS
+from app.models.llm_cache import ParaphraseResultCache
+from app.models.llm_models_schemas import ParaphraseResult
+from app.models.llm_scheduler import ParaphraseBatchScheduler, PRIORITY_INTERACTIVE
+from app.services.llm_suggestion_store import ParaphraseSuggestionStore
+from app.models.llm_text import load_sentence_tokenizer, split_into_sentences, stitch_sentences
+from app.utils.executors import BoundedExecutor
+
+
+class ParaphraseService:
+    def __init__(self, scheduler: ParaphraseBatchScheduler, cache: ParaphraseResultCache,
+                 model_provider: Callable, executor: BoundedExecutor,
+                 suggestions: Optional[ParaphraseSuggestionStore] = None):
+        self.__scheduler = scheduler
+        self.__suggestions = suggestions
+        self.__cache = cache
+        self.__model_provider = model_provider
+        self.__executor = executor
+        # not_loaded -> loading -> ready | failed, 'lazy' when the model is loaded by the first request
+        self.__model_state = "not_loaded"
+        self.__model_error: Optional[str] = None
+        self.__load_seconds: Optional[float] = None
+        self.__warmup_seconds: Optional[float] = None
+
+    async def paraphrase(self, text: str, mode: str = 'default', temperature: float = 0.8,
+                         num_return_sequences: int = 3, allow_cached_sampling: bool = False,
+                         long_text: Optional[bool] = None, priority: int = PRIORITY_INTERACTIVE,
+                         use_cache: bool = True) -> dict:
+        # use_cache=False: neither the result cache nor the stored suggestions are read or written
+        sentences, separators = split_into_sentences(text)
+        auto_long_text = len(text) >= LLM_LONG_TEXT_MIN_CHARS and len(sentences) > 1
+        if long_text is None:
+            long_text = auto_long_text
+        long_text = long_text and len(sentences) > 1
+
+        cacheable = use_cache and self.__cache.is_cacheable(mode, allow_cached_sampling)
+        fingerprint = self.__cache.fingerprint(text, mode, temperature, num_return_sequences, long_text)
+
+        if cacheable:
+            cached = self.__cache.get(fingerprint)
+            if cached is not None:
+                return {"response": cached, "partial": False, "cached": True}
+
+            # suggestions are precomputed for stored resume texts with the automatic long_text choice
+            if self.__suggestions is not None and long_text == auto_long_text:
+                stored = await self.__stored_suggestion(text, mode, num_return_sequences)
+                if stored is not None:
+                    self.__cache.set(fingerprint, stored)
+                    return {"response": stored, "partial": False, "cached": True}
+
+        if long_text:
+            result = await self.__paraphrase_sentences(sentences, separators, mode, temperature,
+                                                       num_return_sequences, priority)
+        else:
+            result = await self.__scheduler.submit(text, mode, temperature, num_return_sequences, priority)
+        # partial results are cut by the generation budget, a later request may do better
+        if cacheable and not result.partial:
+            self.__cache.set(fingerprint, result.candidates)
+        return {"response": result.candidates, "partial": result.partial, "cached": False}
+
+    async def __stored_suggestion(self, text: str, mode: str, num_return_sequences: int) -> Optional[list]:
+        # the table is only a shortcut, a database problem must not fail the request
+        try:
+            return await self.__suggestions.get(text, mode, num_return_sequences)
+        except Exception as ex:
+            print(f"Paraphrase suggestion lookup failed: {ex}")
+            return None
+
+    async def __paraphrase_sentences(self, sentences: list, separators: list, mode: str,
+                                     temperature: float, num_return_sequences: int, priority: int) -> ParaphraseResult:
+        # every sentence is validated on its own by the model, then the candidates
+        # are stitched back in the original order and layout
+        results = await self.__scheduler.submit_many(sentences, mode, temperature, num_return_sequences, priority)
+
+        candidates = []
+        for index in range(num_return_sequences):
+            candidate_sentences = []
+            for sentence, result in zip(sentences, results):
+                # keep the original sentence if the model couldn't give enough variants for it
+                variants = result.candidates
+                candidate_sentences.append(variants[index] if index < len(variants) else sentence)
+            candidates.append(stitch_sentences(candidate_sentences, separators))
+        return ParaphraseResult(candidates=candidates,
+                                partial=any(result.partial for result in results),
+                                generated_sequences=sum(result.generated_sequences for result in results))
+
+    async def stream(self, text: str, mode: str = 'default', temperature: float = 0.8,
+                     num_return_sequences: int = 3, max_time: Optional[float] = None) -> AsyncIterator[tuple]:
+        # yields ("candidate", {...}) while tokens are decoded and one final ("done", {...})
+        if mode != 'sample':
+            # only sampling can be streamed (beam search can't), the other modes give the same
+            # answer as /llm/paraphrase, from the cache or the batch scheduler, as a single "done"
+            yield "done", await self.paraphrase(text, mode, temperature, num_return_sequences)
+            return
+
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def on_text(index: int, partial: str):
+            loop.call_soon_threadsafe(events.put_nowait, {"index": index, "text": partial})
+
+        def generate() -> list:
+            return self.__model_provider().stream_generate(text, temperature, num_return_sequences,
+                                                          on_text, cancelled, max_time)
+
+        generation = asyncio.ensure_future(self.__executor.run(generate))
+        generation.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield "candidate", event
+
+            if generation.exception() is not None:
+                yield "error", {"detail": str(generation.exception())}
+            else:
+                result = generation.result()
+                response = result.candidates[:num_return_sequences]
+                yield "done", {"response": response, "cached": False,
+                               "partial": result.partial or len(response) < num_return_sequences}
+        finally:
+            # client disconnected (generator closed early) or finished: stop decoding either way
+            cancelled.set()
+
+    async def load_sentence_tokenizer(self):
+        # punkt is unpickled once on an executor thread at startup, not on the event loop
+        # by the first long text
+        await self.__executor.run(load_sentence_tokenizer)
+
+    async def warmup(self):
+        # loads the model on an inference worker and runs one short generation, so the
+        # first real request pays neither for the weights nor for lazy allocations
+        if self.__model_state in ("loading", "ready"):
+            return
+        self.__model_state = "loading"
+        try:
+            await self.__executor.run(self.__warmup)
+        except Exception as ex:
+            self.__model_state, self.__model_error = "failed", str(ex)
+            print(f"LLM warmup failed: {ex}")
+            return
+        self.__model_state = "ready"
+        print(f"LLM is ready: loaded in {self.__load_seconds}s, warmed up in {self.__warmup_seconds}s")
+
+    def __warmup(self):
+        started = time.perf_counter()
+        model = self.__model_provider()
+        loaded = time.perf_counter()
+        model.generate("I have three years of experience in software development.", 'default', num_return_sequences=2)
+        self.__load_seconds = round(loaded - started, 3)
+        self.__warmup_seconds = round(time.perf_counter() - loaded, 3)
+
+    def skip_warmup(self):
+        self.__model_state = "lazy"
+
+    def readiness(self) -> dict:
+        return {
+            "ready": self.__model_state in ("ready", "lazy"),
+            "state": self.__model_state,
+            "load_seconds": self.__load_seconds,
+            "warmup_seconds": self.__warmup_seconds,
+            "error": self.__model_error,
+        }
+
+    def stats(self) -> dict:
+        return {"scheduler": self.__scheduler.stats(), "cache": self.__cache.stats(), "model": self.readiness()}
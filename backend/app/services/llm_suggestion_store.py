@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+from app.models.llm_cache import source_hash
+from app.prisma.prisma import prisma
+
+
+class ParaphraseSuggestionStore:
+    """
+        Paraphrase responses stored in the paraphrase_suggestions table,
+        keyed by the hash of the normalized source text.
+    """
+    async def get(self, text: str, mode: str, num_return_sequences: int) -> Optional[list]:
+        suggestion = await prisma.paraphrase_suggestions.find_first(where={
+            "source_hash": source_hash(text),
+            "mode": mode,
+            "num_return_sequences": num_return_sequences
+        })
+        return suggestion.response if suggestion is not None else None
+
+    async def existing_hashes(self, hashes: list, mode: str, num_return_sequences: int) -> set:
+        suggestions = await prisma.paraphrase_suggestions.find_many(where={
+            "source_hash": {"in": hashes},
+            "mode": mode,
+            "num_return_sequences": num_return_sequences
+        })
+        return {suggestion.source_hash for suggestion in suggestions}
+
+    async def touch(self, hashes: list, mode: str, num_return_sequences: int, seen_at: datetime):
+        await prisma.paraphrase_suggestions.update_many(
+            where={"source_hash": {"in": hashes}, "mode": mode, "num_return_sequences": num_return_sequences},
+            data={"last_seen_at": seen_at}
+        )
+
+    async def save_many(self, responses: dict, mode: str, num_return_sequences: int, seen_at: datetime):
+        await prisma.paraphrase_suggestions.create_many(
+            data=[{"source_hash": hash_, "mode": mode, "num_return_sequences": num_return_sequences,
+                   "response": response, "last_seen_at": seen_at}
+                  for hash_, response in responses.items()],
+            skip_duplicates=True
+        )
+
+    async def delete_not_seen_since(self, seen_at: datetime) -> int:
+        return await prisma.paraphrase_suggestions.delete_many(where={"last_seen_at": {"lt": seen_at}})
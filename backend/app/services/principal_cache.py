@@ -0,0 +1,70 @@
+import threading
+from typing import Any, Optional
+from app.configuration.auth_settings import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+from app.prisma.prisma import prisma
+from app.utils.lru_ttl_cache import LRUTTLCache
+
+
+class PrincipalCache:
+    """
+        Authenticated users by token subject (email), so steady-state authorization
+        needs no database query. Entries are dropped by user_id when the user changes.
+    """
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.__principals = LRUTTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        # user_id -> subject, the invalidating services only know the user_id
+        self.__subjects: dict = {}
+        self.__lock = threading.Lock()
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[Any]:
+        return self.__principals.get(subject)
+
+    def set(self, subject: str, principal: Any):
+        with self.__lock:
+            self.__subjects[principal.user_id] = subject
+        self.__principals.set(subject, principal)
+
+    def invalidate_user(self, user_id: str):
+        with self.__lock:
+            subject = self.__subjects.pop(str(user_id), None)
+        if subject is not None:
+            self.__principals.pop(subject)
+            self.invalidations += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__subjects.clear()
+        self.__principals.clear()
+
+    def stats(self) -> dict:
+        return {**self.__principals.stats(), "invalidations": self.invalidations}
+
+
+class RoleDirectory:
+    """
+        The roles table is static (see init.sql), it is loaded once at startup
+        instead of being joined into every user lookup.
+    """
+    def __init__(self):
+        self.__roles: dict = {}
+
+    async def load(self):
+        roles = await prisma.roles.find_many()
+        self.__roles = {role.role_id: role.role for role in roles}
+        print(f"Roles loaded: {sorted(self.__roles.values())}")
+
+    async def get_role(self, role_id: Optional[int]) -> Optional[str]:
+        if role_id is None:
+            return None
+        if role_id not in self.__roles:
+            # a role added after startup, or the preload didn't run
+            role = await prisma.roles.find_unique(where={"role_id": role_id})
+            if role is None:
+                return None
+            self.__roles[role_id] = role.role
+        return self.__roles[role_id]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+role_directory = RoleDirectory()
@@ -6,75 +6,176 @@ from fastapi import testclient
 import jwt as jwt
 from dateutil.relativedelta import relativedelta
 from fastapi import HTTPException
+from pydantic import ValidationError
 from numpy import place
+from prisma.models import resumes
 from app.prisma.prisma import prisma
 from app.dtos.dto_resumes import DtoResumes
 from app.dtos.dto_skills import DtoSkills
 from app.dtos.dto_experiences import DtoExperiences
 from app.dtos.dto_programming_languages import DtoProgrammingLanguages
 from app.dtos.dto_companies import DtoCompanies
+from app.utils.pagination import PAGE_SIZE_DEFAULT, keyset_page
+from app.services.candidate_index import candidate_index
 
 
 class ResumeService:
-    def parse_resume_prog_lang(self, data: dict):
-        programming_languages_data = data.get("programming_languages_data", {}) 
-        if(not programming_languages_data):
+    # list key in the request body -> (dto, primary key that the client must not set)
+    skill_lists = {
+        "programming_languages_data": (DtoProgrammingLanguages, "programming_language_id"),
+        "experiences_data": (DtoExperiences, "experience_id"),
+        "companies_data": (DtoCompanies, "company_id"),
+    }
+
+    def parse_resume_skills(self, data: dict):
+        """
+            Validates the programming languages, experiences and companies lists in one pass
+            before anything is written, every invalid item is reported in a single 422.
+            Returns the parsed (languages, experiences, companies) lists.
+        """
+        if(not data.get("programming_languages_data")):
             raise HTTPException(status_code=422, detail=str("Programming languages data is empty!"))
-        
-        parsed_programming_languages = []
-        for language_data in programming_languages_data:
-            programming_language = DtoProgrammingLanguages(**language_data).model_dump()
-            programming_language.pop("programming_language_id", None)
-            parsed_programming_languages.append(programming_language)
-
-        return parsed_programming_languages
-    
-    def parse_resume_exp(self, data: dict):
-        experiences_data = data.get("experiences_data", {}) 
-
-        parsed_experiences = []
-        for experience_var in experiences_data:
-            experience = DtoExperiences(**experience_var).model_dump()
-            experience.pop("experience_id", None)
-
-            delta = relativedelta(experience['end_date'], experience['start_date'])
-            total_days = delta.days + delta.years * 365.25 + delta.months * 30.44
-            difference_in_years = round(total_days / 365.25, 1)
 
-            experience.update({"experience": difference_in_years})
-            parsed_experiences.append(experience)
-
-        return parsed_experiences
-    
-    def parse_resume_comp(self, data: dict):
-        companies_data = data.get("companies_data", {}) 
-
-        parsed_companies = []
-        for company_var in companies_data:
-            company = DtoCompanies(**company_var).model_dump()
-            company.pop("company_id", None)
-            parsed_companies.append(company)
-
-        return parsed_companies
-    
-    async def get_resumes_without_duplicates(self, data):
-        try:
-            resume_ids = [experience.programming_languages.skills.resume_id_fk for experience in data
-                            if experience.programming_languages is not None]
+        errors = []
+        parsed = {}
+        for key, (dto, id_field) in self.skill_lists.items():
+            parsed[key] = []
+            for index, item in enumerate(data.get(key) or []):
+                try:
+                    parsed_item = dto(**item).model_dump()
+                except ValidationError as ex:
+                    errors.extend({"loc": [key, index, *error["loc"]], "msg": error["msg"], "type": error["type"]}
+                                  for error in ex.errors())
+                    continue
+                except TypeError:
+                    errors.append({"loc": [key, index], "msg": "Input should be an object", "type": "dict_type"})
+                    continue
+                parsed_item.pop(id_field, None)
+                parsed[key].append(parsed_item)
+
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+
+        for experience in parsed["experiences_data"]:
+            if experience["start_date"] is not None and experience["end_date"] is not None:
+                delta = relativedelta(experience['end_date'], experience['start_date'])
+                total_days = delta.days + delta.years * 365.25 + delta.months * 30.44
+                experience["experience"] = round(total_days / 365.25, 1)
+
+        return parsed["programming_languages_data"], parsed["experiences_data"], parsed["companies_data"]
+
+    def pair_resume_skills(self, lang_data: list, exp_data: list, comp_data: list) -> dict:
+        """
+            Programming language -> (experience, company): the n-th experience belongs to the n-th
+            language and the n-th company to the n-th experience. A repeated language keeps its
+            first entry, companies without a name are skipped.
+        """
+        skills = {}
+        for index, language in enumerate(lang_data):
+            name = language["programming_language"]
+            if name in skills:
+                continue
+            experience = None
+            company = None
+            if index < len(exp_data):
+                experience = {k: v for k, v in exp_data[index].items() if k != "programming_language_id_fk"}
+                if index < len(comp_data) and comp_data[index]["name"] != "":
+                    company = {"name": comp_data[index]["name"]}
+            skills[name] = (experience, company)
+        return skills
+
+    def build_experience_create(self, experience: dict, company: Optional[dict]) -> dict:
+        experience = dict(experience)
+        if company is not None:
+            experience["companies"] = {"create": [company]}
+        return experience
+
+    def build_language_create(self, name: str, experience: Optional[dict], company: Optional[dict]) -> dict:
+        programming_language = {"programming_language": name}
+        if experience is not None:
+            programming_language["experiences"] = {"create": [self.build_experience_create(self, experience, company)]}
+        return programming_language
+
+    def build_skills_create(self, skills: dict) -> dict:
+        # nested write for the skills relation of a resume
+        return {"create": [{"programming_languages": {"create": [
+            self.build_language_create(self, name, experience, company)
+            for name, (experience, company) in skills.items()
+        ]}}]}
+
+    def skill_years(self, skills: dict) -> dict:
+        # programming language -> years of experience, as the candidate index stores them
+        return {name: experience["experience"] if experience is not None else None
+                for name, (experience, company) in skills.items()}
+
+    def experience_changed(self, current, experience: dict) -> bool:
+        def day(value):
+            return value.date() if value is not None else None
+
+        return (day(current.start_date) != day(experience["start_date"])
+                or day(current.end_date) != day(experience["end_date"])
+                or current.level != experience["level"]
+                or round(current.experience or 0.0, 1) != round(experience["experience"] or 0.0, 1))
+
+    def diff_experience(self, batcher, language, experience: Optional[dict], company: Optional[dict]):
+        # a language has one experience with at most one company, legacy extra rows are removed
+        experiences = language.experiences or []
+        current = experiences[0] if experiences else None
+        stale_ids = [item.experience_id for item in experiences[1:]]
+
+        if experience is None:
+            if current is not None:
+                stale_ids.append(current.experience_id)
+        elif current is None:
+            batcher.experiences.create(data={**self.build_experience_create(self, experience, company),
+                                             "programming_language_id_fk": language.programming_language_id})
+        else:
+            if self.experience_changed(self, current, experience):
+                batcher.experiences.update(where={"experience_id": current.experience_id}, data=experience)
+
+            current_companies = [item.name for item in current.companies or []]
+            if current_companies != ([company["name"]] if company is not None else []):
+                if current_companies:
+                    batcher.companies.delete_many(where={"experience_id_fk": current.experience_id})
+                if company is not None:
+                    batcher.companies.create(data={**company, "experience_id_fk": current.experience_id})
+
+        if stale_ids:
+            batcher.experiences.delete_many(where={"experience_id": {"in": stale_ids}})
+
+    def diff_skills(self, batcher, resume_existing, skills_updated: dict):
+        """
+            Queues the minimal set of writes turning the stored skills into skills_updated:
+            languages are matched by name, unchanged rows are not touched.
+        """
+        if not resume_existing.skills:
+            batcher.skills.create(data={"resume_id_fk": resume_existing.resume_id,
+                                        **self.build_skills_create(self, skills_updated)["create"][0]})
+            return None
+
+        skill = resume_existing.skills[0]
+        existing_languages = {}
+        stale_ids = []
+        for language in skill.programming_languages or []:
+            name = language.programming_language
+            if name in skills_updated and name not in existing_languages:
+                existing_languages[name] = language
+            else:
+                stale_ids.append(language.programming_language_id)
 
-            unique_resume_ids = list(set(resume_ids))
-
-            resumes = await prisma.resumes.find_many(
-                where={
-                    "resume_id": {"in": unique_resume_ids},
-                    "visibility": "visible"
-                }
-            )
-        except Exception as ex:
-            print(ex)
+        # experiences and companies of removed languages are deleted by the foreign key cascade
+        if stale_ids:
+            batcher.programming_languages.delete_many(where={"programming_language_id": {"in": stale_ids}})
 
+        for name, (experience, company) in skills_updated.items():
+            language = existing_languages.get(name)
+            if language is None:
+                batcher.programming_languages.create(data={**self.build_language_create(self, name, experience, company),
+                                                           "skill_id_fk": skill.skill_id})
+            else:
+                self.diff_experience(self, batcher, language, experience, company)
 
-        return resumes
+        return skill.model_copy(update={"programming_languages": None})
 
     async def create_resume(self, data: dict, user_id):
         resume_data = data.get("resume_data", {}) 
@@ -83,46 +184,23 @@ class ResumeService:
             raise HTTPException(status_code=422, detail=str("Resume data is empty!"))
 
         resume_data = DtoResumes(**resume_data).model_dump()
+        lang_data, exp_data, comp_data = self.parse_resume_skills(self, data)
 
-        try:
-            resume_existing = await prisma.resumes.find_first_or_raise(where={"user_id_fk": user_id})
-            print(resume_existing)
-            # if resume exist => raise error
+        resume_existing = await prisma.resumes.find_first(where={"user_id_fk": user_id})
+        if resume_existing is not None:
             raise HTTPException(status_code=400, detail="Resume has already been created")
-        except HTTPException:
-            raise
-        except Exception as ex:
-            resume_existing = None
-
-
-        lang_data = self.parse_resume_prog_lang(self, data)
-        exp_data = self.parse_resume_exp(self, data)
-        comp_data = self.parse_resume_comp(self, data)
 
         resume_data["user_id_fk"] = user_id
         resume_data.pop("resume_id", None)
+        skills_created = self.pair_resume_skills(self, lang_data, exp_data, comp_data)
+        resume_data["skills"] = self.build_skills_create(self, skills_created)
         try:
-            resume = await prisma.resumes.create(resume_data)
-            skills = await prisma.skills.create(data={"resume_id_fk": resume.resume_id})
-
-            programming_languages = []
-            for programming_language in lang_data:
-                programming_language["skill_id_fk"] = skills.skill_id
-                programming_languages.append(await prisma.programming_languages.create(programming_language))
-            
-            experiences = []
-            for programming_language, experience in zip(programming_languages, exp_data):
-                experience["programming_language_id_fk"] = programming_language.programming_language_id
-                experiences.append(await prisma.experiences.create(experience))
-
-            companies = []
-            for experience, company in zip(experiences, comp_data):
-                print(company)
-                if(company["name"] == ""):
-                    pass
-                else:
-                    company["experience_id_fk"] = experience.experience_id
-                    companies.append(await prisma.companies.create(company))
+            # one nested write: the resume and all its rows are created atomically in a single round trip
+            resume = await prisma.resumes.create(data=resume_data, include={"skills": True})
+            skills = resume.skills[0]
+            resume.skills = None
+            candidate_index.upsert(resume.resume_id, user_id, resume.title, resume.visibility,
+                                   self.skill_years(self, skills_created))
 
             return {"message": "Resume created successfully", "resume": resume, "skills": skills}
         except Exception as e:
@@ -130,77 +208,46 @@ class ResumeService:
 
     async def update_resume(self, data: dict, user_id):
         resume_data_updated = data.get("resume_data", {}) 
-        print(resume_data_updated)
 
         if(not resume_data_updated):
             raise HTTPException(status_code=422, detail=str("Resume data is empty!"))
 
         resume_data_updated = DtoResumes(**resume_data_updated).model_dump()
-
-        try:
-            resume_existing = await prisma.resumes.find_first_or_raise(where={"user_id_fk": user_id})
-        except Exception as ex:
-            # if resume not exist => raise error
+        lang_data_updated, exp_data_updated, comp_data_updated = self.parse_resume_skills(self, data)
+        skills_updated = self.pair_resume_skills(self, lang_data_updated, exp_data_updated, comp_data_updated)
+
+        # the whole stored tree in one query, the diff is computed in memory
+        resume_existing = await prisma.resumes.find_first(
+            where={"user_id_fk": user_id},
+            include={
+                'skills': {
+                    'include': {
+                        'programming_languages': {
+                            'include': {
+                                'experiences': {
+                                    'include': {
+                                        'companies': True
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            })
+        if resume_existing is None:
             raise HTTPException(status_code=400, detail="Resume for update not found")
 
         resume_data_updated["resume_id"] = resume_existing.resume_id
         resume_data_updated["user_id_fk"] = resume_existing.user_id_fk
-        resume = await prisma.resumes.update(where={"resume_id": resume_existing.resume_id}, data=resume_data_updated)
 
-
-        lang_data_updated = self.parse_resume_prog_lang(self, data)
-        exp_data_updated = self.parse_resume_exp(self, data)
-        comp_data_updated = self.parse_resume_comp(self, data)
-        
         try:
-            skills = await prisma.skills.find_first_or_raise(
-                    where={"resume_id_fk": resume_existing.resume_id})
-
-            programming_languages_old = await prisma.programming_languages.find_many(
-                    where={"skill_id_fk": skills.skill_id})
-
-            languages = [{"programming_language": item.programming_language,
-                          "programming_language_id": item.programming_language_id} 
-                            for item in programming_languages_old]
-
-            for item in lang_data_updated:
-                if item['programming_language'] not in [lang_dict["programming_language"] for lang_dict in languages]:
-                    item["skill_id_fk"] = skills.skill_id
-                    language_new = await prisma.programming_languages.create(item)
-                    languages.append({"programming_language": language_new.programming_language, "programming_language_id": language_new.programming_language_id})
-
-            new_languages = []
-            for item in lang_data_updated:
-                for lang_dict in languages:
-                    if lang_dict["programming_language"] == item['programming_language']:
-                        new_languages.append(lang_dict)
-                        break
-
-            for language_dict in languages[:]:
-                language = language_dict["programming_language"]
-                if language not in [item['programming_language'] for item in lang_data_updated]:
-                    language_id = language_dict["programming_language_id"]
-                    await prisma.programming_languages.delete(where={"programming_language_id": language_id})
-                    languages.remove(language_dict)
-
-            languages = new_languages
-
-            for language in languages:
-                try:
-                    experience = await prisma.experiences.find_first_or_raise(where={"programming_language_id_fk": language["programming_language_id"]})
-                    await prisma.experiences.delete(where={"experience_id": experience.experience_id})
-                except Exception as ex:
-                    pass
-
-            experiences = []
-            for programming_language, experience in zip(languages, exp_data_updated):
-                experience["programming_language_id_fk"] = programming_language["programming_language_id"]
-                experiences.append(await prisma.experiences.create(experience))
-
-            companies = []
-            for experience, company in zip(experiences, comp_data_updated):
-                company["experience_id_fk"] = experience.experience_id
-                companies.append(await prisma.companies.create(company))
+            # every queued write is sent in one transaction when the block exits
+            async with prisma.batch_() as batcher:
+                batcher.resumes.update(where={"resume_id": resume_existing.resume_id}, data=resume_data_updated)
+                skills = self.diff_skills(self, batcher, resume_existing, skills_updated)
+            candidate_index.upsert(resume_existing.resume_id, resume_existing.user_id_fk,
+                                   resume_data_updated["title"], resume_data_updated["visibility"],
+                                   self.skill_years(self, skills_updated))
 
             return {"message": "Resume updated successfully", "resume": resume_data_updated, "skills": skills}
         except Exception as e:
@@ -219,206 +266,90 @@ class ResumeService:
             resume_response = await prisma.resumes.delete(
                 where={"resume_id": resume_existing.resume_id}
             )
+            candidate_index.remove(resume_existing.resume_id)
             return {"message": "Resume deleted successfully", "resume": resume_response}
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    async def get_resumes(self, minExperience: Optional[float] = 0.0, maxExperience: Optional[float] = 99.0, experience: Optional[str] = None, programming_language: Optional[str] = None):
-        try:
-            parsed_programming_language = ''
-
-            if programming_language:
-                parsed_programming_language = programming_language.split(',')
-
-            match experience is None, len(parsed_programming_language):
-                case True, 0:
-                    response = await prisma.experiences.find_many(
-                            where={
-                                'experience': {'gte': minExperience, 'lte': maxExperience}
-                            },
-                            include={
-                                'programming_languages': {
-                                    'include': {
-                                        'skills': True
-                                    }
-                                }
-                            })
-                    resumes = await self.get_resumes_without_duplicates(self, response)
-                    print(resumes)
-                    return resumes
-                case True, _:
-                    response = await prisma.experiences.find_many(
-                            where={
-                                'experience': {'gte': minExperience, 'lte': maxExperience}
-                            },
-                            include={
-                                'programming_languages': {
-                                    'where': {
-                                        'programming_language': {'in': parsed_programming_language}
-                                    },
-                                    'include': {
-                                        'skills': True
-                                    }
-                                }
-                            })
-                    resumes = await self.get_resumes_without_duplicates(self, response)
-                    print(resumes)
-                    return resumes
-                case False, 0:
-                    response = await prisma.experiences.find_many(
-                            where={
-                                'experience': {'gte': minExperience, 'lte': maxExperience},
-                                'level': {'in': [experience]}
-                            },
-                            include={
-                                'programming_languages': {
-                                    'include': {
-                                        'skills': True
-                                    }
-                                }
-                            })
-                    resumes = await self.get_resumes_without_duplicates(self, response)
-                    print(resumes)
-                    return resumes
-                case False, _:
-                    response = await prisma.experiences.find_many(
-                        where={
-                                'experience': {'gte': minExperience, 'lte': maxExperience},
-                                'level': {'in': [experience]}
-                            },
-                        include={
-                            'programming_languages': {
-                                'where': {
-                                    'programming_language': {'in': parsed_programming_language}
-                                },
-                                'include': {
-                                    'skills': True
-                                }
-                            }
-                        })
-                    resumes = await self.get_resumes_without_duplicates(self, response)
-                    return resumes
-
-            # test = await prisma.experiences.find_many(
-            #             where={
-            #                     'experience': {'gte': parsed_experience[0], 'lte': parsed_experience[1]},
-            #                     'level': {'in': [parsed_experience[2]]}
-            #                 },
-            #                 include={
-            #                     'programming_languages': {
-            #                         'where': {
-            #                             'programming_language': {'contains': programming_language}
-            #                         }
-            #                     }
-            #                 })
-            # print(test)
-
-            # print(repr(tuple(map(str, parsed_programming_language))))
-
-            # test = await prisma.experiences.query_raw(
-            #     f"""SELECT *
-            #         FROM experiences e
-            #         JOIN programming_languages pl ON e.programming_language_id_fk = pl.programming_language_id
-            #         WHERE pl.programming_language IN {repr(tuple(map(str, parsed_programming_language)))}
-            #         GROUP BY e.experience_id, pl.programming_language_id
-            #         HAVING COUNT(DISTINCT pl.programming_language) >= (SELECT COUNT(*) FROM (VALUES {repr(tuple(map(str, parsed_programming_language)))}) AS v(programming_language));"""
-            #     )
-            # print(test)
+    def build_resume_search(self, minExperience: float, maxExperience: float, experience: Optional[str],
+                            languages: list, after: Optional[str] = None, limit: Optional[int] = None,
+                            count: bool = False):
+        """
+            One query for the resume search: a resume matches when it has an experience in the range
+            (and of the level) for every requested language, or for any language when none is requested.
+            Resumes are ordered by resume_id and start after the `after` id (keyset pagination),
+            with count=True the query returns the number of matching resumes instead.
+            Returns (sql, params) for query_raw.
+        """
+        params = [minExperience, maxExperience]
+        conditions = ["r.visibility = 'visible'", "e.experience BETWEEN $1::real AND $2::real"]
+        if experience is not None:
+            params.append(experience)
+            conditions.append(f"e.level = ${len(params)}")
+        having = ""
+        if languages:
+            placeholders = []
+            for language in languages:
+                params.append(language)
+                placeholders.append(f"${len(params)}")
+            conditions.append(f"pl.programming_language IN ({', '.join(placeholders)})")
+            # AND semantics: every requested language has a matching experience
+            having = f"HAVING COUNT(DISTINCT pl.programming_language) = {len(languages)}"
+        if after is not None and not count:
+            params.append(after)
+            conditions.append(f"r.resume_id > ${len(params)}::uuid")
+
+        sql = f"""
+            SELECT r.resume_id, r.title, r.text, r.user_id_fk, r.visibility
+            FROM resumes r
+            JOIN skills s ON s.resume_id_fk = r.resume_id
+            JOIN programming_languages pl ON pl.skill_id_fk = s.skill_id
+            JOIN experiences e ON e.programming_language_id_fk = pl.programming_language_id
+            WHERE {' AND '.join(conditions)}
+            GROUP BY r.resume_id
+            {having}
+        """
+        if count:
+            return f"SELECT COUNT(*)::int AS count FROM ({sql}) matches", params
+
+        sql += "ORDER BY r.resume_id\n"
+        if limit is not None:
+            params.append(limit)
+            sql += f"LIMIT ${len(params)}\n"
+        return sql, params
+
+    def parse_search_languages(self, programming_language: Optional[str]) -> list:
+        if not programming_language:
+            return []
+        # comma separated, blanks and repeats are dropped
+        return list(dict.fromkeys(language.strip() for language in programming_language.split(',')
+                                  if language.strip()))
+
+    async def get_resumes(self, minExperience: Optional[float] = 0.0, maxExperience: Optional[float] = 99.0,
+                          experience: Optional[str] = None, programming_language: Optional[str] = None,
+                          size: int = PAGE_SIZE_DEFAULT, cursor: Optional[str] = None,
+                          include_total: bool = False) -> dict:
+        filters = (0.0 if minExperience is None else minExperience,
+                   99.0 if maxExperience is None else maxExperience,
+                   experience, self.parse_search_languages(self, programming_language))
+
+        async def fetch(after: Optional[str], take: int) -> list:
+            sql, params = self.build_resume_search(self, *filters, after=after, limit=take)
+            return await prisma.query_raw(sql, *params, model=resumes)
+
+        async def count() -> int:
+            sql, params = self.build_resume_search(self, *filters, count=True)
+            return (await prisma.query_first(sql, *params))["count"]
 
+        try:
+            return await keyset_page(fetch, "resume_id", size, cursor,
+                                     count=count if include_total else None,
+                                     count_key=("resumes", filters[:3], tuple(filters[3])))
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
-    async def get_hired_applicants_languages():
-        team_members_hired = await prisma.team_members.find_many(
-            where={"status": "hired"})
-        teams = []
-        for team_member in team_members_hired:
-            if not any(team.team_id == team_member.team_id_fk for team in teams):
-                teams.append(await prisma.teams.find_unique(where={"team_id": team_member.team_id_fk}))
-
-        language_counts = {}
-        for team in teams:
-            languages = [lang.strip() for lang in team.important_languages.split(',')]
-            for language in languages:
-                if language not in language_counts:
-                    count = sum(1 for tm in team_members_hired if tm.team_id_fk == team.team_id)
-                    language_counts[language] = count
-                else:
-                    language_counts[language] += sum(1 for tm in team_members_hired if tm.team_id_fk == team.team_id)
-
-        return language_counts
-
-    async def get_resumes_languages():
-        resumes = await prisma.resumes.find_many(where={"visibility": "visible"})
-        skills = []
-        for resume in resumes:
-            skills.extend(await prisma.skills.find_many(
-                    where={"resume_id_fk": resume.resume_id}))
-        
-        programming_languages = []
-        for skill in skills:    
-            programming_languages.extend(await prisma.programming_languages.find_many(
-                where={"skill_id_fk": skill.skill_id}))
-    
-        language_counts = {}    
-        for lang in programming_languages:
-            if lang.programming_language not in language_counts:
-                language_counts[lang.programming_language] = 1
-            else:
-                language_counts[lang.programming_language] += 1
-
-        return language_counts
-
-    async def get_resumes_experiences():
-        resumes = await prisma.resumes.find_many(where={"visibility": "visible"})
-        skills = []
-        for resume in resumes:
-            skills.extend(await prisma.skills.find_many(
-                    where={"resume_id_fk": resume.resume_id}))
-        
-        programming_languages = []
-        for skill in skills:    
-            programming_languages.extend(await prisma.programming_languages.find_many(
-                where={"skill_id_fk": skill.skill_id}))
-    
-        experiences = []
-        for lang in programming_languages:
-            experiences.append(await prisma.experiences.find_first_or_raise(
-                where={"programming_language_id_fk": lang.programming_language_id}
-            ))
-
-        experience_levels = []
-        for exp in experiences:
-            if exp.experience >= 10:
-                experience_levels.append("10+")
-            elif exp.experience >= 5:
-                experience_levels.append("5+")
-            elif exp.experience >= 2:
-                experience_levels.append("2+")
-            else:
-                experience_levels.append("<2")
-
-        level_counts = Counter(experience_levels)
-        experience_list = [{'level': level, 'count': count} for level, count in level_counts.items()]
-        level_counts_direct = Counter(exp.level for exp in experiences)
-        level_list = [{'level': level, 'count': count} for level, count in level_counts_direct.items()]
-
-        def sort_levels(level):
-            if level == "<2":
-                return 0
-            elif level == "2+":
-                return 1
-            elif level == "5+":
-                return 2
-            elif level == "10+":
-                return 3
-            else:
-                return 4
-
-        experience_list_sorted = sorted(experience_list, key=lambda x: sort_levels(x['level']))
-
-        return experience_list_sorted, level_list
-    
     async def get_resume_by_resume_id(resume_id):
         try:
             resume = await prisma.resumes.find_unique_or_raise(
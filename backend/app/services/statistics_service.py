@@ -0,0 +1,82 @@
+import time
+import asyncio
+from typing import Optional
+from app.configuration.statistics_settings import STATISTICS_RECONCILE_INTERVAL_SECONDS
+from app.prisma.prisma import prisma
+
+# order of the experience buckets on the dashboard
+EXPERIENCE_BUCKETS = ("<2", "2+", "5+", "10+")
+
+
+class StatisticsService:
+    """
+        Dashboard statistics read from the statistics_counters table, which the init.sql
+        triggers update in the same transaction as every resume, team and team member write.
+        A read costs one query over the distinct languages, buckets and levels. The
+        reconciliation job compares the counters with the data and rewrites the wrong ones.
+    """
+    def __init__(self, interval_seconds: float = STATISTICS_RECONCILE_INTERVAL_SECONDS):
+        self.__interval_seconds = interval_seconds
+        self.__task: Optional[asyncio.Task] = None
+        self.__passes = 0
+        self.__repaired = 0
+        self.__last_pass_seconds: Optional[float] = None
+        self.__last_error: Optional[str] = None
+
+    async def read(self) -> dict:
+        counters = await prisma.statistics_counters.find_many(where={"count": {"gt": 0}})
+        by_kind = {}
+        for counter in sorted(counters, key=lambda counter: (-counter.count, counter.key)):
+            by_kind.setdefault(counter.kind, {})[counter.key] = counter.count
+
+        buckets = by_kind.get("experience_bucket", {})
+        experience_list = [{'level': bucket, 'count': buckets[bucket]} for bucket in EXPERIENCE_BUCKETS if bucket in buckets]
+        # a missing level is stored as ''
+        level_list = [{'level': level or None, 'count': count} for level, count in by_kind.get("experience_level", {}).items()]
+        return {"languages_hired_statistics": by_kind.get("hired_language", {}),
+                "languages_resumes_statistics": by_kind.get("resume_language", {}),
+                "experiences_statistics": (experience_list, level_list)}
+
+    async def reconcile(self) -> int:
+        started = time.perf_counter()
+        result = await prisma.query_first("SELECT statistics_reconcile() AS repaired")
+        repaired = result["repaired"]
+        self.__passes += 1
+        self.__repaired += repaired
+        self.__last_pass_seconds = round(time.perf_counter() - started, 3)
+        if repaired:
+            print(f"Statistics reconciliation repaired {repaired} counters")
+        return repaired
+
+    def start(self):
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.get_running_loop().create_task(self.__loop())
+
+    async def close(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    async def __loop(self):
+        while True:
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.__last_error = str(ex)
+                print(f"Statistics reconciliation failed: {ex}")
+            await asyncio.sleep(self.__interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.__task is not None and not self.__task.done(),
+            "passes": self.__passes,
+            "repaired": self.__repaired,
+            "last_pass_seconds": self.__last_pass_seconds,
+            "last_error": self.__last_error,
+        }
+
+
+statistics_service = StatisticsService()
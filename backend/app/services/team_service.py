@@ -1,3 +1,4 @@
+from typing import Optional
 import fastapi as fastapi
 import jwt as jwt
 from app.dtos.dto_users import DtoUsers
@@ -6,6 +7,9 @@ from app.dtos.dto_teams import DtoTeams
 from app.dtos.dto_team_members import DtoTeamMembers
 from fastapi import HTTPException
 from app.services.auth_service import AuthService
+from app.utils.pagination import PAGE_SIZE_DEFAULT, keyset_page
+from app.services.candidate_index import candidate_index, parse_team_languages
+from app.configuration.candidate_settings import CANDIDATES_DEFAULT
 
 class TeamService:
     async def create_team(data, user_id):
@@ -75,23 +79,36 @@ class TeamService:
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    async def get_teams(user_id):
+    async def get_teams(user_id, size: int = PAGE_SIZE_DEFAULT, cursor: Optional[str] = None,
+                        include_total: bool = False):
         user_data = await prisma.users.find_unique(where={
             "user_id": user_id["user_id"]
         })
+        # employers see their own teams, administrators all of them
+        where = {"owner_id_fk": user_id["user_id"]} if user_data.role_id_fk == 2 else {}
+
+        async def fetch(after: Optional[str], take: int) -> list:
+            # members and their users come with the page in the same query
+            return await prisma.teams.find_many(
+                where={**where, "team_id": {"gt": after}} if after is not None else where,
+                include={"team_members": {"include": {"users": True}}},
+                order={"team_id": "asc"},
+                take=take)
+
+        async def count() -> int:
+            return await prisma.teams.count(where=where)
+
         try:
-            if user_data.role_id_fk == 2:
-                teams = await prisma.teams.find_many(where={
-                    "owner_id_fk": user_id["user_id"]
-                })
-            else:
-                teams = await prisma.teams.find_many()
-            
+            page = await keyset_page(fetch, "team_id", size, cursor,
+                                     count=count if include_total else None,
+                                     count_key=("teams", where.get("owner_id_fk")))
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
         teams_with_members = []
-        for team in teams:
+        for team in page["items"]:
             team_data = DtoTeams(
                 team_id=team.team_id,
                 name=team.name,
@@ -102,16 +119,16 @@ class TeamService:
                 users=[]
             )
 
-            team_members = await prisma.team_members.find_many(where={"team_id_fk": team.team_id})
-            for team_member in team_members:
+            for team_member in team.team_members or []:
                 team_data.team_members.append(DtoTeamMembers(
                     member_id=team_member.member_id, 
                     team_id_fk=team_member.team_id_fk, 
                     user_id_fk=team_member.user_id_fk, 
                     status=team_member.status))
 
-            team_users = await prisma.users.find_many(where={"team_members": {"some": {"team_id_fk": team.team_id}}})
-            for team_user in team_users:
+            team_users = {team_member.users.user_id: team_member.users for team_member in team.team_members or []
+                          if team_member.users is not None}
+            for team_user in team_users.values():
                 team_data.users.append(DtoUsers(
                     user_id=team_user.user_id,
                     first_name=team_user.first_name,
@@ -124,4 +141,19 @@ class TeamService:
 
             teams_with_members.append(team_data)
     
-        return teams_with_members
\ No newline at end of file
+        page["items"] = teams_with_members
+        return page
+
+    async def get_candidates(team_id, principal, limit: int = CANDIDATES_DEFAULT):
+        try:
+            team = await prisma.teams.find_first_or_raise(where={"team_id": team_id}, include={"team_members": True})
+        except Exception as ex:
+            raise HTTPException(status_code=404, detail="Team not found")
+        if principal.role != "Administrator" and team.owner_id_fk != principal.user_id:
+            raise HTTPException(status_code=400, detail="You are not the team owner")
+
+        languages = parse_team_languages(team.important_languages)
+        # applicants already in the team, whatever their status, are not suggested again
+        members = {team_member.user_id_fk for team_member in team.team_members or []}
+        candidates = await candidate_index.candidates(languages, limit, exclude_users=members)
+        return {"team_id": team.team_id, "languages": languages, "candidates": candidates}
@@ -1,6 +1,8 @@
 import fastapi as fastapi
 import jwt as jwt
 from app.prisma.prisma import prisma
+from app.services.principal_cache import principal_cache
+from app.services.candidate_index import candidate_index
 from fastapi import HTTPException
 
 class UserService:
@@ -93,8 +95,13 @@ class UserService:
         update_response = await prisma.users.update(
                                 where={"user_id": user_id},
                                 data=user_data)
+        # the approval flag is part of the cached principal
+        principal_cache.invalidate_user(user_id)
         return {"message": "User updated successfully", "user": update_response}
     
     async def deleteUser(user_id):
         response = await prisma.users.delete(where={"user_id": user_id})
+        principal_cache.invalidate_user(user_id)
+        # the resume went with the user (foreign key cascade)
+        candidate_index.remove_user(user_id)
         return response
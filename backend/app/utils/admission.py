@@ -0,0 +1,153 @@
+import math
+import time
+import asyncio
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from fastapi import HTTPException, Request
+
+
+class AdmissionController:
+    """
+        Bounds the number of requests admitted to a slow backend. Requests over the limit
+        are rejected right away with 503 and a Retry-After estimate instead of queueing
+        without limit; admitted requests get a deadline (504 when it passes) and their work
+        is cancelled as soon as the client disconnects, so nothing is computed for nobody.
+    """
+    def __init__(self, name: str, max_in_flight: int, deadline_seconds: float,
+                 disconnect_poll_seconds: float = 0.25, ewma_alpha: float = 0.2):
+        self.name = name
+        self.__max_in_flight = max(1, max_in_flight)
+        self.__deadline_seconds = deadline_seconds
+        self.__disconnect_poll_seconds = disconnect_poll_seconds
+        self.__ewma_alpha = ewma_alpha
+        self.__ewma_seconds: Optional[float] = None
+        self.__in_flight = 0
+        self.__admitted = 0
+        self.__rejected = 0
+        self.__timed_out = 0
+        self.__disconnected = 0
+
+    def retry_after(self) -> int:
+        # by the time a typical request takes, the requests in flight now are mostly served
+        if self.__ewma_seconds is None:
+            return 1
+        return max(1, math.ceil(self.__ewma_seconds))
+
+    @contextmanager
+    def admit(self):
+        release = self.__take_slot()
+        try:
+            yield
+        finally:
+            release()
+
+    async def run(self, request: Request, work: Callable[[], Awaitable],
+                  deadline_seconds: Optional[float] = None):
+        timeout = self.__timeout(deadline_seconds)
+
+        with self.admit():
+            task = asyncio.ensure_future(work())
+            watcher = asyncio.ensure_future(self.__cancel_on_disconnect(request, task))
+            try:
+                return await asyncio.wait_for(task, timeout if timeout and timeout > 0 else None)
+            except asyncio.TimeoutError:
+                self.__timed_out += 1
+                raise HTTPException(status_code=504, detail=f"Request took longer than {timeout:g}s")
+            except asyncio.CancelledError:
+                if watcher.cancelled() or not watcher.done() or not watcher.result():
+                    raise
+                self.__disconnected += 1
+                # nginx convention, nobody is listening for the response anyway
+                raise HTTPException(status_code=499, detail="Client closed request")
+            finally:
+                watcher.cancel()
+
+    def admit_stream(self, events: AsyncIterator, deadline_seconds: Optional[float] = None) -> tuple:
+        """
+            Admission of a streamed response: the slot is taken right away (503 before anything
+            is sent) and held until the stream ends; past the deadline the stream ends with an
+            ("error", ...) event. Returns the wrapped stream and a release callback for the
+            response's background task, which frees the slot when the stream never started
+            because the client was gone. A disconnect during the stream closes it.
+        """
+        timeout = self.__timeout(deadline_seconds)
+        release = self.__take_slot()
+
+        async def stream():
+            deadline = time.monotonic() + timeout if timeout and timeout > 0 else None
+            try:
+                while True:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    try:
+                        event = await asyncio.wait_for(events.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError:
+                        self.__timed_out += 1
+                        yield "error", {"detail": f"Request took longer than {timeout:g}s"}
+                        return
+                    yield event
+            except (asyncio.CancelledError, GeneratorExit):
+                self.__disconnected += 1
+                raise
+            finally:
+                await events.aclose()
+                release()
+
+        return stream(), release
+
+    def __take_slot(self) -> Callable[[], None]:
+        if self.__in_flight >= self.__max_in_flight:
+            self.__rejected += 1
+            raise HTTPException(status_code=503, detail=f"Server is overloaded, {self.name} queue is full",
+                                headers={"Retry-After": str(self.retry_after())})
+
+        self.__in_flight += 1
+        self.__admitted += 1
+        started = time.perf_counter()
+        released = False
+
+        def release():
+            # idempotent, a stream may release from its own end and from the response's background task
+            nonlocal released
+            if not released:
+                released = True
+                self.__in_flight -= 1
+                self.__observe(time.perf_counter() - started)
+
+        return release
+
+    def __timeout(self, deadline_seconds: Optional[float]) -> Optional[float]:
+        # a client may ask for a shorter deadline, never for a longer one
+        timeout = self.__deadline_seconds
+        if deadline_seconds is not None and deadline_seconds > 0:
+            timeout = min(timeout, deadline_seconds) if timeout and timeout > 0 else deadline_seconds
+        return timeout
+
+    async def __cancel_on_disconnect(self, request: Request, task: asyncio.Future) -> bool:
+        while not task.done():
+            if await request.is_disconnected():
+                task.cancel()
+                return True
+            await asyncio.sleep(self.__disconnect_poll_seconds)
+        return False
+
+    def __observe(self, seconds: float):
+        if self.__ewma_seconds is None:
+            self.__ewma_seconds = seconds
+        else:
+            self.__ewma_seconds += self.__ewma_alpha * (seconds - self.__ewma_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "in_flight": self.__in_flight,
+            "max_in_flight": self.__max_in_flight,
+            "deadline_seconds": self.__deadline_seconds,
+            "admitted": self.__admitted,
+            "rejected": self.__rejected,
+            "timed_out": self.__timed_out,
+            "disconnected": self.__disconnected,
+            "latency_ewma_ms": round(self.__ewma_seconds * 1000, 3) if self.__ewma_seconds is not None else None,
+            "retry_after_seconds": self.retry_after(),
+        }
@@ -0,0 +1,57 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from app.utils.metrics import LatencyWindow
+
+
+class BoundedExecutor:
+    """
+        Fixed-size thread pool for blocking work called from async handlers,
+        so the event loop keeps serving other requests while it runs.
+        Reports how long jobs wait for a free worker and how long they run.
+    """
+    def __init__(self, name: str, max_workers: int, initializer: Optional[Callable] = None):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.__executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                             thread_name_prefix=name,
+                                             initializer=initializer)
+        self.__submitted = 0
+        self.__active = 0
+        self.__lock = threading.Lock()
+        self.__queue_waits = LatencyWindow()
+        self.__run_times = LatencyWindow()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        submitted_at = time.perf_counter()
+        self.__submitted += 1
+
+        def call():
+            started = time.perf_counter()
+            self.__queue_waits.add(started - submitted_at)
+            with self.__lock:
+                self.__active += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self.__lock:
+                    self.__active -= 1
+                self.__run_times.add(time.perf_counter() - started)
+
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, call)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "submitted": self.__submitted,
+            "active": self.__active,
+            "queue_wait_ms": self.__queue_waits.summary(),
+            "run_time_ms": self.__run_times.summary(),
+        }
+
+    def shutdown(self, wait: bool = True):
+        # jobs that have not started yet are dropped, running ones are allowed to finish
+        self.__executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,28 @@
+from collections import deque
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LatencyWindow:
+    # keeps the last `size` durations (in seconds) and reports them in milliseconds
+    def __init__(self, size: int = 1000):
+        self.__values = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.__values.append(seconds)
+
+    def summary(self) -> dict:
+        values = sorted(self.__values)
+        return {
+            "count": len(values),
+            "mean": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 3),
+            "p95": round(percentile(values, 95) * 1000, 3),
+            "p99": round(percentile(values, 99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if values else 0.0,
+        }
@@ -0,0 +1,63 @@
+import math
+import json
+import uuid
+import base64
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional
+from fastapi import HTTPException
+from app.utils.lru_ttl_cache import LRUTTLCache
+
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 100
+
+# the total is only used to show the number of pages, a few seconds old value
+# saves a count query on every page of the same listing
+total_counts = LRUTTLCache(maxsize=1024, ttl_seconds=30)
+
+
+def encode_cursor(key: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": str(key)}).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        # every listing is keyed by a uuid, a tampered key would fail in the database instead
+        return str(uuid.UUID(json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"]))
+    except Exception:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+async def keyset_page(fetch: Callable[[Optional[str], int], Awaitable[list]], key_field: str,
+                      size: int, cursor: Optional[str] = None,
+                      count: Optional[Callable[[], Awaitable[int]]] = None,
+                      count_key: Optional[Hashable] = None) -> dict:
+    """
+        One page ordered by the unique key_field: fetch(after, take) returns the rows with
+        key_field > after (all rows when after is None), ordered by key_field, at most take of them.
+        One extra row is fetched to know whether there's a next page, so every page costs the
+        same whatever its position. count (optional) runs as a separate query next to the page,
+        its result is cached under count_key.
+    """
+    after = decode_cursor(cursor)
+    total = total_counts.get(count_key) if count is not None and count_key is not None else None
+
+    if count is not None and total is None:
+        rows, total = await asyncio.gather(fetch(after, size + 1), count())
+        if count_key is not None:
+            total_counts.set(count_key, total)
+    else:
+        rows = await fetch(after, size + 1)
+
+    items = rows[:size]
+    page = {
+        "items": items,
+        "size": size,
+        "sort_by": [key_field],
+        "next_cursor": encode_cursor(getattr(items[-1], key_field)) if len(rows) > size else None,
+    }
+    if total is not None:
+        page["total"] = total
+        page["pages"] = math.ceil(total / size)
+    return page
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+
+try:
+    from app.services import candidate_index as candidate_index_module
+except RuntimeError as ex:
+    # the Prisma client is generated by "prisma generate" in app/
+    pytest.skip(str(ex), allow_module_level=True)
+
+
+class FakePrisma:
+    """
+        Returns the given records from query_raw, `during_query` runs while the query is
+        in flight, like a resume write handled by the same worker during a rebuild.
+    """
+    def __init__(self, records: list, during_query=None):
+        self.records = records
+        self.during_query = during_query
+
+    async def query_raw(self, query: str):
+        if self.during_query is not None:
+            self.during_query()
+        await asyncio.sleep(0)
+        return self.records
+
+
+def record(resume_id: str, user_id: str, languages: dict) -> dict:
+    return {"resume_id": resume_id, "user_id_fk": user_id, "title": resume_id,
+            "languages": list(languages), "experiences": list(languages.values())}
+
+
+def test_writes_during_a_rebuild_are_replayed_on_its_result(monkeypatch):
+    index = candidate_index_module.CandidateIndex(experience_cap=10)
+
+    def writes():
+        # the query result below was read before these writes
+        index.upsert("new", "u3", "new", "visible", {"Go": 2})
+        index.remove("stale")
+        index.upsert("hidden-now", "u4", "hidden-now", "hidden", {"Go": 9})
+
+    monkeypatch.setattr(candidate_index_module, "prisma", FakePrisma([
+        record("kept", "u1", {"Go": 1}),
+        record("stale", "u2", {"Go": 5}),
+        record("hidden-now", "u4", {"Go": 9}),
+    ], during_query=writes))
+
+    async def scenario():
+        await index.rebuild(force=True)
+        return await index.candidates(["Go"], 10)
+
+    matches = asyncio.run(scenario())
+
+    assert [match["resume_id"] for match in matches] == ["new", "kept"]
+    assert index.stats()["rebuilds"] == 1
+
+
+def test_writes_after_a_rebuild_apply_right_away(monkeypatch):
+    index = candidate_index_module.CandidateIndex(experience_cap=10)
+    monkeypatch.setattr(candidate_index_module, "prisma", FakePrisma([record("kept", "u1", {"Go": 1})]))
+
+    async def scenario():
+        await index.rebuild()
+        index.remove_user("u1")
+        index.upsert("added", "u2", "added", "visible", {"Go": 3})
+        return await index.candidates(["go"], 10)
+
+    assert [match["resume_id"] for match in asyncio.run(scenario())] == ["added"]
@@ -0,0 +1,94 @@
+from app.models.candidate_rows import CandidateRows
+
+CAP = 10
+
+
+def ids(matches: list) -> list:
+    return [match["resume_id"] for match in matches]
+
+
+def test_more_team_languages_always_rank_higher():
+    rows = CandidateRows()
+    # the maximum experience in one language can't beat a second matched language
+    rows.upsert("one-language", "u1", "Senior", {"Python": 30})
+    rows.upsert("two-languages", "u2", "Junior", {"Python": 0.5, "Go": 0.5})
+    rows.upsert("no-match", "u3", "Other", {"Java": 5})
+
+    matches = rows.match(["Python", "Go"], 10, CAP)
+
+    assert ids(matches) == ["two-languages", "one-language"]
+    assert matches[0]["coverage"] == 1.0
+    assert matches[1]["coverage"] == 0.5
+    assert matches[1]["matched_languages"] == ["Python"]
+
+
+def test_experience_breaks_ties_and_is_capped():
+    rows = CandidateRows()
+    rows.upsert("capped", "u1", "", {"Python": 40})
+    rows.upsert("at-cap", "u2", "", {"Python": CAP})
+    rows.upsert("less", "u3", "", {"Python": 2})
+
+    matches = rows.match(["Python"], 10, CAP)
+
+    assert ids(matches)[2] == "less"
+    # above the cap the experience doesn't count, equal scores are ordered by row
+    assert ids(matches)[:2] == ["capped", "at-cap"]
+    assert matches[0]["score"] == matches[1]["score"]
+    assert matches[0]["experience"] == {"Python": 40.0}
+
+
+def test_languages_are_matched_case_and_space_insensitively():
+    rows = CandidateRows()
+    rows.upsert("resume", "u1", "", {" python ": 3, "Type  Script": 1})
+
+    matches = rows.match(["PYTHON", "type script"], 10, CAP)
+
+    assert ids(matches) == ["resume"]
+    assert matches[0]["matched_languages"] == ["python", "Type Script"]
+
+
+def test_limit_and_excluded_users():
+    rows = CandidateRows()
+    for number in range(20):
+        rows.upsert(f"r{number}", f"u{number}", "", {"Go": number})
+
+    matches = rows.match(["Go"], 3, 100, exclude_users=["u19"])
+
+    assert ids(matches) == ["r18", "r17", "r16"]
+
+
+def test_removed_rows_never_match_and_are_reused():
+    rows = CandidateRows()
+    rows.upsert("old", "u1", "", {"Rust": 4})
+    rows.remove("old")
+
+    assert rows.match(["Rust"], 10, CAP) == []
+
+    rows.upsert("new", "u2", "", {"Go": 1})
+    assert rows.used == 1
+    assert ids(rows.match(["Go"], 10, CAP)) == ["new"]
+
+    rows.remove_user("u2")
+    assert rows.match(["Go"], 10, CAP) == []
+
+
+def test_upsert_replaces_the_languages_of_a_resume():
+    rows = CandidateRows()
+    rows.upsert("resume", "u1", "", {"Java": 3})
+    rows.upsert("resume", "u1", "", {"Kotlin": 3})
+
+    assert rows.match(["Java"], 10, CAP) == []
+    assert ids(rows.match(["Kotlin"], 10, CAP)) == ["resume"]
+
+
+def test_rows_and_languages_grow_past_the_initial_capacity():
+    rows = CandidateRows(capacity=2, languages_capacity=8)
+    languages = [f"language {number}" for number in range(20)]
+    for number in range(5):
+        rows.upsert(f"r{number}", f"u{number}", "", {language: 1 for language in languages[number:]})
+
+    matches = rows.match(languages[:5], 10, CAP)
+
+    assert rows.bits.shape[1] >= 5 and rows.experience.shape[0] >= 20
+    assert ids(matches) == ["r0", "r1", "r2", "r3", "r4"]
+    assert [match["coverage"] for match in matches] == [1.0, 0.8, 0.6, 0.4, 0.2]
@@ -0,0 +1,62 @@
+import time
+from app.models.llm_cache import ParaphraseResultCache, normalize_text, source_hash
+
+
+def test_runs_of_spaces_share_a_fingerprint():
+    first = ParaphraseResultCache.fingerprint("I  write\tPython  code.", 'default', 0.8, 3)
+    second = ParaphraseResultCache.fingerprint("I write Python code. ", 'default', 0.8, 3)
+
+    assert first == second
+
+
+def test_line_layout_is_part_of_the_fingerprint():
+    # long texts are stitched back in their layout, so different layouts need their own entries
+    one_line = "Led a team of five. Shipped the billing service."
+    two_lines = "Led a team of five.\nShipped the billing service."
+    two_paragraphs = "Led a team of five.\n\nShipped the billing service."
+
+    fingerprints = {ParaphraseResultCache.fingerprint(text, 'default', 0.8, 3, by_sentences=True)
+                    for text in (one_line, two_lines, two_paragraphs)}
+
+    assert len(fingerprints) == 3
+    assert normalize_text(" Led  a team.\n  Shipped it. ") == "Led a team.\nShipped it."
+    assert source_hash(two_lines) != source_hash(one_line)
+
+
+def test_beam_search_ignores_temperature_sampling_does_not():
+    assert ParaphraseResultCache.fingerprint("text", 'default', 0.2, 3) == \
+        ParaphraseResultCache.fingerprint("text", 'default', 0.9, 3)
+    assert ParaphraseResultCache.fingerprint("text", 'sample', 0.2, 3) != \
+        ParaphraseResultCache.fingerprint("text", 'sample', 0.9, 3)
+    assert ParaphraseResultCache.fingerprint("text", 'default', 0.8, 3) != \
+        ParaphraseResultCache.fingerprint("text", 'default', 0.8, 3, by_sentences=True)
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache" / "paraphrase_cache.sqlite3")
+    cache = ParaphraseResultCache(maxsize=4, ttl_seconds=60, disk_path=path)
+    cache.set("key", ["first", "second"])
+    cache.close()
+
+    restarted = ParaphraseResultCache(maxsize=4, ttl_seconds=60, disk_path=path)
+
+    assert restarted.get("key") == ["first", "second"]
+    assert restarted.disk_hits == 1
+    # promoted to memory, the disk isn't read again
+    assert restarted.get("key") == ["first", "second"]
+    assert restarted.disk_hits == 1
+    restarted.close()
+
+
+def test_expired_disk_entries_are_missing_and_pruned(tmp_path):
+    path = str(tmp_path / "paraphrase_cache.sqlite3")
+    cache = ParaphraseResultCache(maxsize=4, ttl_seconds=0.05, disk_path=path)
+    cache.set("key", ["old"])
+    cache.close()
+    time.sleep(0.1)
+
+    restarted = ParaphraseResultCache(maxsize=4, ttl_seconds=0.05, disk_path=path)
+
+    assert restarted.get("key") is None
+    assert restarted.disk_hits == 0
+    restarted.close()
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import pytest
+from app.models.llm_scheduler import ParaphraseBatchScheduler, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from app.utils.executors import BoundedExecutor
+
+
+class FakeModel:
+    """
+        Stands in for the paraphrase model: records every batch and answers each text with
+        its own candidates, so a caller getting someone else's slice is noticed.
+    """
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+        # a batch whose first text is "block" waits until release is set
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+
+    def get_batch_response(self, texts, mode, temperature, num_return_sequences):
+        self.batches.append((list(texts), mode, num_return_sequences))
+        if texts[0] == "block":
+            self.blocked.set()
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return [[f"{text} {number}" for number in range(num_return_sequences)] for text in texts]
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test-inference", 1)
+    yield executor
+    executor.shutdown()
+
+
+def test_concurrent_submits_share_one_batch(executor):
+    model = FakeModel()
+
+    async def scenario():
+        scheduler = ParaphraseBatchScheduler(lambda: model, executor, max_batch_size=8, batch_window_ms=50)
+        texts = [f"text {number}" for number in range(5)]
+        results = await asyncio.gather(*(scheduler.submit(text, 'default', 0.8, 2) for text in texts))
+        await scheduler.close()
+        return texts, results
+
+    texts, results = asyncio.run(scenario())
+
+    assert len(model.batches) == 1
+    assert sorted(model.batches[0][0]) == texts
+    assert results == [[f"{text} 0", f"{text} 1"] for text in texts]
+
+
+def test_interactive_requests_overtake_background_ones(executor):
+    model = FakeModel()
+
+    async def scenario():
+        scheduler = ParaphraseBatchScheduler(lambda: model, executor, max_batch_size=8, batch_window_ms=10)
+        # the only executor worker is busy, so both groups below wait in the queue
+        blocker = asyncio.ensure_future(scheduler.submit("block"))
+        await asyncio.get_running_loop().run_in_executor(None, model.blocked.wait, 5)
+
+        # different settings, so the background request can't ride along in the interactive batch
+        background = asyncio.ensure_future(scheduler.submit("background", 'default', 0.8, 1,
+                                                            priority=PRIORITY_BACKGROUND))
+        await asyncio.sleep(0.05)
+        interactive = asyncio.ensure_future(scheduler.submit("interactive", 'default', 0.8, 2,
+                                                             priority=PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0.05)
+
+        model.release.set()
+        await asyncio.gather(blocker, background, interactive)
+        await scheduler.close()
+
+    asyncio.run(scenario())
+
+    assert [texts for texts, _, _ in model.batches] == [["block"], ["interactive"], ["background"]]
+
+
+def test_batch_failure_reaches_every_waiting_caller(executor):
+    error = RuntimeError("out of memory")
+    model = FakeModel(error=error)
+
+    async def scenario():
+        scheduler = ParaphraseBatchScheduler(lambda: model, executor, max_batch_size=8, batch_window_ms=50)
+        results = await asyncio.gather(*(scheduler.submit(f"text {number}") for number in range(3)),
+                                        return_exceptions=True)
+        await scheduler.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert len(model.batches) == 1
+    assert results == [error, error, error]
@@ -0,0 +1,24 @@
+from app.models.llm_text import split_into_sentences, stitch_sentences
+
+RESUME_TEXT = "  Led a team of five engineers. Shipped the billing service.\n\n- Built the CI pipeline\n- Mentored two juniors  \n"
+
+
+def test_split_and_stitch_restore_the_layout():
+    sentences, separators = split_into_sentences(RESUME_TEXT)
+
+    assert len(separators) == len(sentences) + 1
+    assert stitch_sentences(sentences, separators) == RESUME_TEXT
+
+
+def test_lines_are_never_joined_into_one_sentence():
+    sentences, _ = split_into_sentences(RESUME_TEXT)
+
+    assert "Built the CI pipeline" in sentences[-2]
+    assert "Mentored two juniors" in sentences[-1]
+    assert all("\n" not in sentence for sentence in sentences)
+
+
+def test_stitch_puts_paraphrased_sentences_in_place():
+    sentences, separators = split_into_sentences("First line.\nSecond line.")
+
+    assert stitch_sentences([sentence.upper() for sentence in sentences], separators) == "FIRST LINE.\nSECOND LINE."
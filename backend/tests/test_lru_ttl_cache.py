@@ -0,0 +1,50 @@
+import time
+from app.utils.lru_ttl_cache import LRUTTLCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUTTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # "a" is used, so "b" is now the least recently used one
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_expired_entries_are_missing():
+    cache = LRUTTLCache(maxsize=4, ttl_seconds=0.05)
+    cache.set("short", 1)
+    cache.set("long", 2, ttl_seconds=60)
+    time.sleep(0.1)
+
+    assert cache.get("short", "missing") == "missing"
+    assert cache.get("long") == 2
+    assert len(cache) == 1
+
+
+def test_no_ttl_keeps_entries():
+    cache = LRUTTLCache(maxsize=4, ttl_seconds=0)
+    cache.set("key", "value")
+
+    assert cache.ttl_seconds is None
+    assert cache.get("key") == "value"
+
+
+def test_pop_clear_and_stats():
+    cache = LRUTTLCache(maxsize=4)
+    cache.set("key", "value")
+
+    assert cache.pop("key") == "value"
+    assert cache.pop("key", "gone") == "gone"
+    cache.set("other", 1)
+    cache.clear()
+    assert cache.get("other") is None
+
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (0, 0, 1)
+    assert stats["hit_rate"] == 0.0
@@ -0,0 +1,76 @@
+import base64
+import json
+import uuid
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_page, total_counts
+
+
+def test_cursor_round_trip():
+    key = str(uuid.uuid4())
+
+    assert decode_cursor(encode_cursor(key)) == key
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(json.dumps({"before": str(uuid.uuid4())}).encode()).decode(),
+    encode_cursor("00000000-0000-0000-0000-00000000000z"),
+    encode_cursor("x' or '1'='1"),
+    base64.urlsafe_b64encode(json.dumps({"after": 5}).encode()).decode(),
+])
+def test_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 422
+
+
+def fake_table(size: int):
+    rows = sorted((SimpleNamespace(id=str(uuid.uuid4())) for _ in range(size)), key=lambda row: row.id)
+
+    async def fetch(after, take):
+        return [row for row in rows if after is None or row.id > after][:take]
+
+    return rows, fetch
+
+
+def test_pages_cover_every_row_once():
+    rows, fetch = fake_table(7)
+
+    async def all_pages():
+        seen, cursor = [], None
+        while True:
+            page = await keyset_page(fetch, "id", 3, cursor)
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return seen
+
+    assert asyncio.run(all_pages()) == rows
+
+
+def test_total_is_counted_once_per_cache_key():
+    _, fetch = fake_table(5)
+    counted = []
+
+    async def count():
+        counted.append(1)
+        return 5
+
+    async def two_pages():
+        total_counts.clear()
+        first = await keyset_page(fetch, "id", 2, count=count, count_key=("test", 1))
+        second = await keyset_page(fetch, "id", 2, first["next_cursor"], count=count, count_key=("test", 1))
+        return first, second
+
+    first, second = asyncio.run(two_pages())
+
+    assert (first["total"], first["pages"]) == (5, 3)
+    assert second["total"] == 5
+    assert len(counted) == 1
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Badge, Box, Button, Container, Flex, HStack, Heading, List, ListItem, Radio, RadioGroup, Select, Spinner, Stack, Text, Tooltip, VStack, useToast } from '@chakra-ui/react';
 import { decodeToken, getChatList, deleteChat, getUserData } from '../utils/Api';
 import { useNavigate } from 'react-router-dom';
@@ -19,6 +19,8 @@ const ChatList = ()  => {
     const [currentPage, setCurrentPage] = useState(1);
     const [totalPages, setTotalPages] = useState(1);
     const [pageSize, setPageSize] = useState(2);
+    // cursors[i] opens page i + 1, pages are fetched by cursor and not by number
+    const cursors = useRef<(string | null)[]>([null]);
     const [filtration, setFiltration] = useState('none');
     const [auth, setAuth] = useState(false);
     const toast = useToast();
@@ -39,10 +41,11 @@ const ChatList = ()  => {
                     email: tokenResponse.email,
                     role: tokenResponse.role_id_fk,
                 });
-                const chatData: any = await getChatList(currentPage, pageSize, filtration);
+                const chatData: any = await getChatList(cursors.current[currentPage - 1] ?? null, pageSize, filtration);
                 
                 setChats(chatData.data.items);
                 setTotalPages(chatData.data.pages);
+                cursors.current[currentPage] = chatData.data.next_cursor;
 
                 // Fetch user details for all users in the chats
                 const userIds = chatData.data.items.flatMap((chat: { chat_users: any[]; }) => chat.chat_users.map(user => user.user_id));
@@ -77,7 +80,7 @@ const ChatList = ()  => {
     }, [currentPage, pageSize, filtration]);
 
     const handleNextPage = () => {
-        if (currentPage < totalPages) {
+        if (currentPage < totalPages && cursors.current[currentPage]) {
             setCurrentPage((prevPage) => prevPage + 1);
         }
     };
@@ -91,6 +94,7 @@ const ChatList = ()  => {
     const handlePageSizeChange = (event: any) => {
         const newSize = parseInt(event.target.value, 10);
         setPageSize(newSize);
+        cursors.current = [null];
         setCurrentPage(1);
     };
 
@@ -148,7 +152,7 @@ const ChatList = ()  => {
             </Flex>
             </Flex>
 
-            <RadioGroup onChange={(value) => setFiltration(value)} value={filtration}>
+            <RadioGroup onChange={(value) => { setFiltration(value); cursors.current = [null]; setCurrentPage(1); }} value={filtration}>
                 <Stack spacing={3} direction='row'>
                     <Radio value="none">{t('chatManagement.allChats')}</Radio>
                     <Radio value="teams">{t('chatManagement.teamChats')}</Radio>
@@ -1,4 +1,4 @@
-import { ReactNode, useEffect, useState } from 'react';
+import { ReactNode, useEffect, useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Container, VStack, Text, Button, Spinner, Select, Flex, Input, useToast, FormControl, FormLabel, NumberInput, NumberInputField, NumberInputStepper, NumberIncrementStepper, NumberDecrementStepper, RadioGroup, Stack, Radio, Spacer, Box, FlexProps, useColorModeValue, Icon } from '@chakra-ui/react';
 import { Select as SelectAdvanced } from "chakra-react-select";
@@ -13,6 +13,8 @@ const ResumeList = () => {
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const [pageSize, setPageSize] = useState(2);
+  // cursors[i] opens page i + 1, pages are fetched by cursor and not by number
+  const cursors = useRef<(string | null)[]>([null]);
   const [selectedExperienceLevel, setSelectedExperienceLevel] = useState("");
   const [selectedLanguages, setSelectedLanguages] = useState([]);
   const [selectedMinExperience, setSelectedMinExperience] = useState(0)
@@ -90,7 +92,7 @@ const ResumeList = () => {
 
   const fetchResumes = async () => {
     try {
-      const response: any = await getResumeList({ page: currentPage, size: pageSize, minExperience: selectedMinExperience, maxExperience: selectedMaxExperience, experienceLevel: selectedExperienceLevel, programming_language: selectedLanguages });
+      const response: any = await getResumeList({ cursor: cursors.current[currentPage - 1] ?? null, size: pageSize, minExperience: selectedMinExperience, maxExperience: selectedMaxExperience, experienceLevel: selectedExperienceLevel, programming_language: selectedLanguages });
       if (response === "Your account has not yet been approved by the administrator"){
         toast({
           title: t('toastMessages.waitConfirmation'),
@@ -103,6 +105,7 @@ const ResumeList = () => {
       }
       setResumes(response.data.items);
       setTotalPages(response.data.pages);
+      cursors.current[currentPage] = response.data.next_cursor;
       const tokenResponse = await decodeToken();
       setTokenData({
         email: tokenResponse.email,
@@ -148,8 +151,13 @@ const ResumeList = () => {
     }
   }
 
+  const resetPages = () => {
+    cursors.current = [null];
+    setCurrentPage(1);
+  };
+
   const handleNextPage = () => {
-    if (currentPage < totalPages) {
+    if (currentPage < totalPages && cursors.current[currentPage]) {
       setCurrentPage((prevPage) => prevPage + 1);
     }
   };
@@ -163,12 +171,13 @@ const ResumeList = () => {
   const handlePageSizeChange = (event: any) => {
     const newSize = parseInt(event.target.value, 10);
     setPageSize(newSize);
-    setCurrentPage(1);
+    resetPages();
   };
 
   const handleLevelChange = (event: any) => {
     const newLevel = event.target.value;
     setSelectedExperienceLevel(newLevel);
+    resetPages();
   }
 
   const handleMinExperienceChange = (event: any) => {
@@ -177,16 +186,19 @@ const ResumeList = () => {
     if (newMinExperience > selectedMaxExperience) {
       setSelectedMaxExperience(newMinExperience);
     }
+    resetPages();
   }
 
   const handleMaxExperienceChange = (event: any) => {
     const newMaxExperience = event;
     setSelectedMaxExperience(newMaxExperience);
+    resetPages();
   }
 
   const handleLanguageChange = (selectedOptions:any) => {
     const selectedValues = selectedOptions.map((option: { value: any; }) => option.value);
     setSelectedLanguages(selectedValues);
+    resetPages();
   };
 
   return (
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, Fragment } from 'react';
+import React, { useState, useEffect, useRef, Fragment } from 'react';
 import {
   Container,
   VStack,
@@ -29,6 +29,8 @@ const TeamList = () => {
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const [pageSize, setPageSize] = useState(2);
+  // cursors[i] opens page i + 1, pages are fetched by cursor and not by number
+  const cursors = useRef<(string | null)[]>([null]);
   const toast = useToast();
   const [auth, setAuth] = useState(false);
   const navigate = useNavigate();
@@ -69,7 +71,7 @@ const TeamList = () => {
           email: tokenResponse.email,
           role: tokenResponse.role_id_fk,
         });
-        const response: any = await getTeamList(currentPage, pageSize);
+        const response: any = await getTeamList(cursors.current[currentPage - 1] ?? null, pageSize);
         if (response === "Your account has not yet been approved by the administrator"){
           toast({
             title: t('toastMessages.waitConfirmation'),
@@ -91,6 +93,7 @@ const TeamList = () => {
 
         setTeams(teamsWithOwnerInfo);
         setTotalPages(response.data.pages);
+        cursors.current[currentPage] = response.data.next_cursor;
         console.log(teamsWithOwnerInfo);
       }
     } catch (error) {
@@ -105,7 +108,7 @@ const TeamList = () => {
   }, [currentPage, pageSize]);
 
   const handleNextPage = () => {
-    if (currentPage < totalPages) {
+    if (currentPage < totalPages && cursors.current[currentPage]) {
       setCurrentPage((prevPage) => prevPage + 1);
     }
   };
@@ -119,6 +122,7 @@ const TeamList = () => {
   const handlePageSizeChange = (event: any) => {
     const newSize = parseInt(event.target.value, 10);
     setPageSize(newSize);
+    cursors.current = [null];
     setCurrentPage(1);
   };
 
@@ -252,9 +252,13 @@ export const resumeToPDF = async (user_id: string) => {
   }
 }
 
-export const getResumeList = async ({ page, size, minExperience, maxExperience, experienceLevel, programming_language }: { page: number, size: number, minExperience?: number, maxExperience?: number, experienceLevel?: string, programming_language?: any }) => {
+export const getResumeList = async ({ cursor, size, minExperience, maxExperience, experienceLevel, programming_language }: { cursor: string | null, size: number, minExperience?: number, maxExperience?: number, experienceLevel?: string, programming_language?: any }) => {
   try {
-    let queryString = `/resume/list?page=${page}&size=${size}`;
+    let queryString = `/resume/list?size=${size}&include_total=true`;
+
+    if (cursor) {
+      queryString += `&cursor=${encodeURIComponent(cursor)}`;
+    }
 
     if (minExperience) {
       queryString += `&minExperience=${minExperience}`;
@@ -357,9 +361,9 @@ export const userRefuse = async (user_id: string) => {
   }
 }
 
-export const getTeamList = async (page: number, size: number) => {
+export const getTeamList = async (cursor: string | null, size: number) => {
   try {
-    const response = await api.get(`/team/list?page=${page}&size=${size}`, {
+    const response = await api.get(`/team/list?size=${size}&include_total=true${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`, {
       headers: {
         Authorization: `Bearer ${localStorage.getItem('access_token')}`
       }});
@@ -643,9 +647,9 @@ export const checkChatTeamExisting = async(team_id:any) => {
   }
 }
 
-export const getChatList = async (page: number, size: number, filtration: string) => {
+export const getChatList = async (cursor: string | null, size: number, filtration: string) => {
   try {
-    const response = await api.get(`/chat/list?page=${page}&size=${size}&filtration=${filtration}`, {
+    const response = await api.get(`/chat/list?size=${size}&filtration=${filtration}&include_total=true${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`, {
       headers: {
         Authorization: `Bearer ${localStorage.getItem('access_token')}`
       }});